@@ -9,12 +9,16 @@ import os
 import sys
 import threading
 import time
-from flask import Flask, jsonify
+from flask import Flask, jsonify, request
 from atlas_ai_telegram_bot import AtlasAITelegramBot
+from webhook import WEBHOOK_PATH, create_ingress, webhook_enabled, webhook_public_url
 
 # Create Flask app for health checks
 app = Flask(__name__)
 
+# Updates posted by Telegram in webhook mode
+ingress = create_ingress()
+
 @app.route('/')
 def home():
     return jsonify({
@@ -29,7 +33,8 @@ def health():
     return jsonify({
         "status": "healthy",
         "service": "atlas-ai-telegram-bot",
-        "version": "multi-user-media"
+        "version": "multi-user-media",
+        "webhook": ingress.get_stats() if webhook_enabled() else None
     })
 
 @app.route('/ready')
@@ -39,11 +44,29 @@ def ready():
         "bot_running": True
     })
 
+@app.route(WEBHOOK_PATH, methods=['POST'])
+def telegram_webhook():
+    """Acknowledge Telegram at once; the bot drains the queue in the background"""
+    if not ingress.verify(request.headers.get('X-Telegram-Bot-Api-Secret-Token')):
+        return jsonify({"ok": False}), 403
+    
+    update = request.get_json(silent=True)
+    if not isinstance(update, dict):
+        return jsonify({"ok": False}), 400
+    
+    if not ingress.push(update):
+        return jsonify({"ok": False, "error": "queue full"}), 503
+    return jsonify({"ok": True})
+
 def run_bot():
     """Run the Telegram bot in background"""
     try:
         bot = AtlasAITelegramBot()
-        bot.run()
+        if webhook_enabled():
+            ingress.register(bot, webhook_public_url())
+            ingress.run(bot)
+        else:
+            bot.run()
     except Exception as e:
         print(f"Bot error: {e}")
 
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Asyncio Runtime for ATLAS AI Telegram Bots
+Polling, Groq calls and rate-limited Telegram sends as coroutines on one event loop
+"""
+
+import os
+import json
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+import aiohttp
+from send_scheduler import AsyncOutboundScheduler
+from update_dispatcher import poll_backoff
+
+class AsyncBotRuntime:
+    """Event-loop runtime shared by AtlasAITelegramBot and MediaAtlasBot"""
+
+    def __init__(self, bot, max_in_flight: int = 500, executor_workers: int = 8):
+        self.bot = bot
+        self.api_url = bot.telegram_api
+        self.max_in_flight = max(1, max_in_flight)
+        self.executor_workers = max(1, executor_workers)
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self._in_flight: Optional[asyncio.Semaphore] = None
+        self._tails: Dict[Hashable, asyncio.Task] = {}  # last task per user, for ordering
+        # Same per-chat and global limits as the thread runtime's OutboundScheduler
+        self.outbound = AsyncOutboundScheduler.like(bot.outbound)
+
+    async def post_json(self, url: str, payload: Dict, headers: Optional[Dict] = None,
+                        timeout: float = 30) -> Tuple[int, Any]:
+        """POST JSON and return (status, decoded body or None)"""
+        async with self.session.post(url, json=payload, headers=headers,
+                                     timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+            try:
+                body = await response.json(content_type=None)
+            except Exception:
+                body = None
+            return response.status, body
+
+    async def post_form(self, method: str, fields: Dict[str, str], files: Dict[str, Tuple[bytes, str]],
+                        timeout: float = 30) -> Tuple[int, Any]:
+        """POST multipart form data (rebuilt per call, so retries can resend it)"""
+        form = aiohttp.FormData()
+        for key, value in fields.items():
+            form.add_field(key, value)
+        for name, (data, filename) in files.items():
+            form.add_field(name, data, filename=filename)
+        async with self.session.post(f"{self.api_url}/{method}", data=form,
+                                     timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+            try:
+                body = await response.json(content_type=None)
+            except Exception:
+                body = None
+            return response.status, body
+
+    async def _file_data(self, file) -> Tuple[bytes, str]:
+        """(bytes, filename) for a path or GeneratedFile, reading disk off the loop"""
+        if getattr(file, 'data', None) is not None:
+            return file.data, file.name
+        file_path = getattr(file, 'path', file)
+        data = await self.loop.run_in_executor(self.executor, _read_file, file_path)
+        return data, getattr(file, 'name', None) or os.path.basename(file_path)
+
+    async def get_updates(self, offset: int) -> Optional[List[Dict]]:
+        """Long-poll Telegram for new updates; None if Telegram refused the call"""
+        async with self.session.get(
+            f"{self.api_url}/getUpdates",
+            params={'offset': offset, 'timeout': 30},
+            timeout=aiohttp.ClientTimeout(total=35)
+        ) as response:
+            if response.status != 200:
+                print(f"❌ getUpdates failed: {response.status}")
+                return None
+            data = await response.json()
+            return data.get('result') or []
+
+    async def send_message(self, chat_id: int, text: str) -> bool:
+        """Send message via Telegram API"""
+        try:
+            status, _ = await self.outbound.submit(chat_id, lambda: self.post_json(
+                f"{self.api_url}/sendMessage",
+                {
+                    'chat_id': chat_id,
+                    'text': text,
+                    'parse_mode': 'HTML'
+                }
+            ))
+            return status == 200
+        except Exception:
+            return False
+
+    async def _send_file(self, method: str, field: str, chat_id: int, file,
+                         extra: Optional[Dict[str, str]] = None) -> Optional[Dict]:
+        """Upload a file path or in-memory GeneratedFile; returns the sent message or None"""
+        upload = {field: await self._file_data(file)}
+        fields = {'chat_id': str(chat_id), **(extra or {})}
+        status, body = await self.outbound.submit(chat_id, lambda: self.post_form(method, fields, upload))
+        if status != 200:
+            return None
+        return (body or {}).get('result') or {}
+
+    async def send_voice_message(self, chat_id: int, voice_file_path) -> Optional[Dict]:
+        """Send voice message via Telegram API; returns the sent message or None"""
+        try:
+            return await self._send_file('sendVoice', 'voice', chat_id, voice_file_path)
+        except Exception as e:
+            print(f"❌ Voice send error: {e}")
+            return None
+
+    async def send_document(self, chat_id: int, document_path, caption: str = "") -> Optional[Dict]:
+        """Send document via Telegram API; returns the sent message or None"""
+        try:
+            return await self._send_file('sendDocument', 'document', chat_id, document_path,
+                                         {'caption': caption})
+        except Exception as e:
+            print(f"❌ Document send error: {e}")
+            return None
+
+    async def send_media_group(self, chat_id: int, media: List[Dict], files: Dict[str, Any]) -> Optional[List[Dict]]:
+        """Send an album; `files` maps attach:// names to GeneratedFiles. Returns the sent messages or None"""
+        try:
+            uploads = {name: await self._file_data(file) for name, file in files.items()}
+            fields = {'chat_id': str(chat_id), 'media': json.dumps(media)}
+            status, body = await self.outbound.submit(
+                chat_id, lambda: self.post_form('sendMediaGroup', fields, uploads, timeout=60)
+            )
+            if status != 200:
+                return None
+            return (body or {}).get('result') or []
+        except Exception as e:
+            print(f"❌ Media group send error: {e}")
+            return None
+
+    async def send_file_id(self, method: str, field: str, chat_id: int, file_id: str,
+                           extra: Optional[Dict[str, str]] = None) -> bool:
+        """Re-send a file Telegram already has, by file_id (no upload)"""
+        try:
+            status, _ = await self.outbound.submit(chat_id, lambda: self.post_json(
+                f"{self.api_url}/{method}", {'chat_id': chat_id, field: file_id, **(extra or {})}
+            ))
+            return status == 200
+        except Exception as e:
+            print(f"❌ Cached file send error: {e}")
+            return False
+
+    async def run_sync(self, func: Callable[..., Any], *args) -> Any:
+        """Run blocking handler code (document builds, TTS) off the event loop"""
+        return await self.loop.run_in_executor(self.executor, func, *args)
+
+    def call(self, coro) -> Any:
+        """Run a coroutine on the loop from a handler thread and wait for it"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    async def _run_after(self, previous: Optional[asyncio.Task], args: Tuple):
+        """Wait for the user's previous update, then handle this one"""
+        try:
+            if previous is not None:
+                try:
+                    await previous
+                except Exception:
+                    pass
+            await self.bot.process_message_async(self, *args)
+        except Exception as e:
+            print(f"❌ Handler error: {e}")
+        finally:
+            self._in_flight.release()
+
+    async def dispatch(self, key: Hashable, args: Tuple):
+        """Schedule an update: ordered per user, concurrent across users"""
+        await self._in_flight.acquire()
+        task = asyncio.create_task(self._run_after(self._tails.get(key), args))
+        self._tails[key] = task
+        task.add_done_callback(lambda done: self._tails.pop(key, None) if self._tails.get(key) is done else None)
+
+    async def run(self):
+        """Poll Telegram and dispatch updates until cancelled"""
+        self.loop = asyncio.get_running_loop()
+        self.executor = ThreadPoolExecutor(max_workers=self.executor_workers, thread_name_prefix="atlas-async")
+        self._in_flight = asyncio.Semaphore(self.max_in_flight)
+        connector = aiohttp.TCPConnector(limit=self.max_in_flight)
+        self.bot.async_runtime = self
+
+        print(f"⚡ Async runtime active ({self.max_in_flight} in-flight updates)")
+
+        try:
+            async with aiohttp.ClientSession(connector=connector) as session:
+                self.session = session
+                failures = 0
+                while True:
+                    try:
+                        updates = await self.get_updates(self.bot.last_update_id + 1)
+                        if updates is None:
+                            # 401/409/5xx come back at once; don't hammer Telegram
+                            failures += 1
+                            await asyncio.sleep(poll_backoff(failures))
+                            continue
+                        failures = 0
+                        for update in updates:
+                            self.bot.last_update_id = update['update_id']
+                            parsed = self.bot.parse_update(update)
+                            if parsed:
+                                await self.dispatch(*parsed)
+                    except asyncio.TimeoutError:
+                        print("⏳ Polling timeout...")
+                    except Exception as e:
+                        print(f"❌ Error: {e}")
+                        await asyncio.sleep(5)
+        finally:
+            self.bot.async_runtime = None
+            self.executor.shutdown(wait=False)
+
+def _read_file(file_path: str) -> bytes:
+    """Read a file for upload"""
+    with open(file_path, 'rb') as f:
+        return f.read()
@@ -7,11 +7,35 @@ Complete AI intelligence with multi-user support for cloud hosting
 
 import os
 import sys
+import json
 import time
+import threading
+import asyncio
 import requests
+from contextlib import ExitStack
 from datetime import datetime
-from typing import Dict
-from media_handler import MediaHandler
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, Union
+from media_handler import GeneratedFile, MediaHandler, parse_report_formats
+from update_dispatcher import UpdateDispatcher, poll_backoff
+from webhook import delete_webhook
+from http_transport import get_transport
+from send_scheduler import create_outbound_scheduler
+from document_jobs import DocumentJobPool
+from temp_janitor import TempJanitor
+from file_cache import FileIdCache, sent_file_id
+from tts_pool import TTSPool
+from groq_client import CircuitOpenError, create_groq_client
+from groq_stream import StreamingEditor, iter_stream_deltas
+from session_store import SessionStore
+from session_backend import SQLiteSessionBackend
+from context_builder import ContextBuilder, message_tokens
+from conversation_export import EXPORT_FORMATS, export_jsonl, export_xlsx
+from response_cache import ResponseCache, needs_clock
+from single_flight import SingleFlight
+from model_router import ModelRouter
+from memory_compactor import MemoryCompactor, build_summary_request
+
+INCOMPLETE_REPLY_NOTE = "\n\n⚠️ Reply interrupted - send your message again for the full answer."
 
 class AtlasAITelegramBot:
     """ATLAS AI Telegram Bot with Complete Intelligence for Render"""
@@ -22,41 +46,142 @@ class AtlasAITelegramBot:
         self.assistant_name = os.getenv('AssistantName', 'ATLAS')
         self.creator_name = os.getenv('Creator', 'K.V.SARVESH')
         self.port = int(os.getenv('PORT', 8000))
-        self.user_sessions = {}
         self.last_update_id = 0
         self.active_users = set()
+        self.user_sessions = SessionStore(
+            max_sessions=int(os.getenv('SESSION_MAX', 10000)),
+            idle_ttl=float(os.getenv('SESSION_IDLE_TTL', 86400)),
+            max_history=int(os.getenv('SESSION_MAX_HISTORY', 50)),
+            on_evict=self.active_users.discard,
+            backend=SQLiteSessionBackend(os.getenv('SESSION_DB_PATH')) if os.getenv('SESSION_DB_PATH') else None,
+            flush_interval=float(os.getenv('SESSION_FLUSH_INTERVAL', 2.0))
+        )
         self.total_messages = 0
         self.start_time = datetime.now()
         self.media_handler = MediaHandler()  # Add media handling capabilities
+        # Uploaded files are deleted right away; the sweep catches leftovers and enforces the quota
+        self.temp_janitor = TempJanitor(
+            self.media_handler.temp_dir,
+            quota_bytes=int(float(os.getenv('TEMP_QUOTA_MB', 200)) * 1024 * 1024),
+            max_age=float(os.getenv('TEMP_MAX_AGE', 3600)),
+            interval=float(os.getenv('TEMP_SWEEP_INTERVAL', 60))
+        )
+        self.temp_janitor.start()
+        self.tts = TTSPool(
+            workers=int(os.getenv('TTS_WORKERS', 1)),
+            max_pending=int(os.getenv('TTS_QUEUE_SIZE', 8)),
+            timeout=float(os.getenv('TTS_TIMEOUT', 30)),
+            cache_bytes=int(float(os.getenv('TTS_CACHE_MB', 32)) * 1024 * 1024),
+            bitrate=os.getenv('TTS_OPUS_BITRATE', '32k')
+        )
+        # Telegram file_ids of generated files, so repeats skip both the build and the upload
+        self.file_cache = FileIdCache(max_entries=int(os.getenv('FILE_CACHE_SIZE', 5000)))
+        self.document_jobs = DocumentJobPool(
+            workers=int(os.getenv('DOCUMENT_WORKERS', 2)),
+            max_pending=int(os.getenv('DOCUMENT_QUEUE_SIZE', 16)),
+            timeout=float(os.getenv('DOCUMENT_TIMEOUT', 60))
+        )
+        self.stats_lock = threading.Lock()
+        self.dispatcher = UpdateDispatcher(
+            workers=int(os.getenv('BOT_WORKERS', 8)),
+            queue_size=int(os.getenv('BOT_QUEUE_SIZE', 256))
+        )
+        self.runtime_mode = os.getenv('BOT_RUNTIME', 'sync').lower()  # 'sync' or 'async'
+        self.async_runtime = None  # Set while the asyncio runtime is running
+        self.http = get_transport()  # Shared keep-alive pools for Telegram and Groq
+        self.telegram_api = f"{os.getenv('TELEGRAM_API_URL', 'https://api.telegram.org')}/bot{self.bot_token}"
+        self.outbound = create_outbound_scheduler()
+        self.groq = create_groq_client(self.http, self.groq_api_key)
+        self.stream_responses = os.getenv('GROQ_STREAMING', 'true').lower() != 'false'
+        self.stream_edit_interval = float(os.getenv('STREAM_EDIT_INTERVAL', 1.0))
+        self.prompt_tokens_sent = 0
+        self.prompt_requests = 0
+        self.groq_flights = SingleFlight()
+        # Trivial turns go to a small instant model; MODEL_ROUTES overrides the routing table
+        self.router = ModelRouter()
+        # Replies to history-free prompts, shared by every user who asks the same thing
+        self.response_cache = ResponseCache(
+            max_entries=int(os.getenv('RESPONSE_CACHE_SIZE', 2000)),
+            ttl=float(os.getenv('RESPONSE_CACHE_TTL', 3600))
+        )
+        self.context_builder = ContextBuilder(
+            static_head=f"""You are {self.assistant_name}, a highly advanced AI assistant with complete Atlas AI capabilities deployed on Render cloud services.
+
+Your capabilities include:
+• Complete knowledge across all domains
+• Advanced reasoning and analysis
+• Natural, engaging conversations
+• Real-time information access
+• Creative intelligence and writing
+• Technical expertise (programming, science, math)
+• Research and detailed explanations
+• Memory of conversation context
+
+Be highly intelligent, comprehensive, and helpful. Use emojis appropriately. Provide detailed, well-structured responses.""",
+            static_tail="You are the complete Atlas AI with full intelligence capabilities.",
+            token_budget=int(os.getenv('CONTEXT_TOKEN_BUDGET', 6000)),
+            max_messages=int(os.getenv('CONTEXT_MAX_MESSAGES', 8))
+        )
+        # Turns leaving the context window are folded into a running summary in the background
+        self.summary_tokens = int(os.getenv('SUMMARY_MAX_TOKENS', 400))
+        self.compactor = MemoryCompactor(
+            self.user_sessions,
+            self.summarize_turns,
+            window=self.context_builder.max_messages,
+            batch=int(os.getenv('SUMMARY_BATCH', 4))
+        ) if os.getenv('MEMORY_SUMMARIES', 'true').lower() != 'false' and self.context_builder.max_messages else None
         
-        if not self.bot_token or not self.groq_api_key:
+        if not self.bot_token or not (self.groq_api_key or os.getenv('GROQ_API_KEYS')):
             print("❌ Missing required environment variables")
             print("Please set TELEGRAM_BOT_TOKEN and GroqAPIKey in Render")
             sys.exit(1)
     
     def get_user_session(self, user_id: int) -> Dict:
         """Get or create user session with multi-user support"""
-        if user_id not in self.user_sessions:
-            self.user_sessions[user_id] = {
-                "messages": [],
-                "last_activity": datetime.now(),
-                "name": None,
-                "username": None,
-                "message_count": 0,
-                "session_start": datetime.now(),
-                "preferences": {
-                    "response_style": "detailed",
-                    "language": "en"
-                }
+        session = self.user_sessions.get_or_create(user_id, self.new_session)
+        self.active_users.add(user_id)
+        return session
+    
+    def new_session(self) -> Dict:
+        """Create a fresh session for a user"""
+        return {
+            "messages": [],
+            "last_activity": datetime.now(),
+            "name": None,
+            "username": None,
+            "message_count": 0,
+            "session_start": datetime.now(),
+            "preferences": {
+                "response_style": "detailed",
+                "language": "en"
             }
-            self.active_users.add(user_id)
-        return self.user_sessions[user_id]
+        }
     
     def get_bot_stats(self) -> str:
         """Get comprehensive bot statistics"""
         uptime = datetime.now() - self.start_time
         hours = int(uptime.total_seconds() // 3600)
         minutes = int((uptime.total_seconds() % 3600) // 60)
+        dispatch = self.dispatcher.get_stats()
+        http_stats = self.http.get_stats()
+        http_requests = sum(host['requests'] for host in http_stats.values())
+        http_reused = sum(host['reused'] for host in http_stats.values())
+        outbound = (self.async_runtime or self).outbound.get_stats()
+        groq = self.groq.get_stats()
+        documents = self.document_jobs.get_stats()
+        store = self.user_sessions.get_stats()
+        temp = self.temp_janitor.get_stats()
+        file_cache = self.file_cache.get_stats()
+        replies = self.response_cache.get_stats()
+        flights = self.groq_flights.get_stats()
+        routing = self.router.get_stats()
+        compaction = self.compactor.get_stats() if self.compactor else None
+        models = ', '.join(
+            f"{model.split('-')[2] if model.count('-') >= 2 else model} {stats['latency_ms']}ms"
+            for model, stats in routing['models'].items()
+        ) or 'no calls yet'
+        tts = self.tts.get_stats()
+        avg_prompt_tokens = self.prompt_tokens_sent // self.prompt_requests if self.prompt_requests else 0
         
         return f"""📊 {self.assistant_name} AI - Multi-User Statistics
 
@@ -66,12 +191,30 @@ class AtlasAITelegramBot:
 🕐 <b>Uptime:</b> {hours}h {minutes}m
 📈 <b>Total Messages:</b> {self.total_messages}
 👥 <b>Active Users:</b> {len(self.active_users)}
-💾 <b>Total Sessions:</b> {len(self.user_sessions)}
+💾 <b>Total Sessions:</b> {store['sessions']}/{store['max_sessions']}
+🧹 <b>Evicted Sessions:</b> {store['evicted_idle']} idle, {store['evicted_lru']} LRU
+✂️ <b>Trimmed Messages:</b> {store['trimmed_messages']}
+💽 <b>Persisted Sessions:</b> {store.get('persistence', {}).get('rows_written', 'off')} written, {store['loaded']} restored
+🧮 <b>Prompt Tokens:</b> {self.prompt_tokens_sent} sent, {avg_prompt_tokens} avg/request
+🗜️ <b>Memory Summaries:</b> {f"{compaction['compactions']} runs, {compaction['folded_turns']} turns folded" if compaction else 'off'}
 
-🔧 <b>AI Engine:</b> Groq LLaMA 3.3 70B
+🔧 <b>AI Engine:</b> Groq LLaMA 3.3 70B + 3.1 8B Instant
+🧭 <b>Model Routing:</b> {routing['routed'].get('fast', 0)} fast, {routing['routed'].get('full', 0)} full ({models})
+⚡ <b>Cached Replies:</b> {replies['hits']} hits, {replies['misses']} misses ({replies['hit_rate']:.0%})
+🪢 <b>Coalesced AI Calls:</b> {flights['coalesced']} shared, {flights['upstream_calls']} sent upstream
+🔁 <b>AI Retries:</b> {groq['retries']} ({groq['failures']} failed, {groq['rejected']} fast-failed)
+🔌 <b>Circuit Breaker:</b> {groq['breaker_state']} (opened {groq['breaker_opened']}x)
+🔑 <b>API Keys:</b> {groq['keys']['keys']} in pool, {groq['failovers']} rate-limit failovers
 🌐 <b>Multi-User Support:</b> ✅ Active
 🧠 <b>Memory per User:</b> Individual sessions
-🔄 <b>Concurrent Processing:</b> Enabled
+🔄 <b>Concurrent Processing:</b> {dispatch['workers']} workers
+📥 <b>Queued Updates:</b> {dispatch['queued']}/{dispatch['queue_size']}
+🔗 <b>Connection Reuse:</b> {http_reused}/{http_requests} requests
+📄 <b>Document Jobs:</b> {documents['completed']} built, {documents['timed_out']} timed out, {documents['rejected']} rejected
+📤 <b>Outbound Sends:</b> {outbound['sent']} sent, {outbound['queued']} queued, {outbound['rate_limited']} rate-limited
+♻️ <b>File Cache:</b> {file_cache['hits']} hits, {file_cache['misses']} misses ({file_cache['hit_rate']:.0%}), {file_cache['entries']} cached
+🗣️ <b>Voice Synthesis:</b> {tts['completed']} synthesized, {tts['hits']} from audio cache ({tts['cached_bytes'] // 1024} KB)
+🧹 <b>Temp Files:</b> {temp['usage_bytes'] // 1024} KB in use, {temp['bytes_reclaimed'] // 1024} KB reclaimed
 
 📱 <b>Multi-User Features:</b>
 ✅ Individual conversation memory
@@ -103,147 +246,456 @@ class AtlasAITelegramBot:
 📅 <b>Started:</b> {session['session_start'].strftime('%Y-%m-%d %H:%M:%S')}
 ⚙️ <b>Response Style:</b> {session['preferences']['response_style']}
 🌐 <b>Language:</b> {session['preferences']['language']}
-💾 <b>Memory Items:</b> {len(session['messages'])}"""
+💾 <b>Memory Items:</b> {len(session['messages'])}
+🧮 <b>Last Prompt Tokens:</b> {session.get('last_prompt_tokens', 0)}
+📜 <b>Summarized Turns:</b> {session.get('summarized_turns', 0)}
+🧭 <b>Last Model:</b> {session.get('last_model', 'none yet')}"""
     
-    def call_groq_ai(self, message: str, user_id: int) -> str:
-        """Call Groq AI for intelligent responses"""
-        try:
-            session = self.get_user_session(user_id)
-            
-            messages = [
-                {
-                    "role": "system", 
-                    "content": f"""You are {self.assistant_name}, a highly advanced AI assistant with complete Atlas AI capabilities deployed on Render cloud services.
-
-Your capabilities include:
-• Complete knowledge across all domains
-• Advanced reasoning and analysis
-• Natural, engaging conversations
-• Real-time information access
-• Creative intelligence and writing
-• Technical expertise (programming, science, math)
-• Research and detailed explanations
-• Memory of conversation context
-
-Be highly intelligent, comprehensive, and helpful. Use emojis appropriately. Provide detailed, well-structured responses.
-
-Current context: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+    def is_cacheable(self, session: Dict, message: str) -> bool:
+        """History-free, clock-free requests may be answered from the response cache unless the user opted out"""
+        return (self.response_cache.enabled and not session["messages"] and not session.get("summary")
+                and not session.get("cache_bypass") and not needs_clock(message))
+    
+    def build_groq_request(self, message: str, session: Dict) -> Dict:
+        """Build the Groq chat completion payload for a user message"""
+        if self.is_cacheable(session, message):
+            # Date but no clock or name: the same question builds the same payload all day
+            dynamic_context = f"""Current date: {datetime.now().strftime('%Y-%m-%d (%A)')}
+Platform: Render Cloud Services
+Creator: {self.creator_name}"""
+        else:
+            dynamic_context = f"""Current context: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 User: {session.get('name', 'User')}
 Session history: {len(session['messages'])} messages
 Platform: Render Cloud Services
-Creator: {self.creator_name}
-
-You are the complete Atlas AI with full intelligence capabilities."""
-                }
-            ]
-            
-            # Add conversation history
-            if session["messages"]:
-                messages.extend(session["messages"][-8:])
-            
-            messages.append({"role": "user", "content": message})
+Creator: {self.creator_name}"""
+        
+        # Conversation history is filled newest-first until the token budget is spent. With summaries on,
+        # every stored turn is still unsummarized (the compactor removes what it folds), so none is skipped
+        messages, prompt_tokens = self.context_builder.build(
+            dynamic_context, session["messages"], message, session.get("summary", ""),
+            max_messages=0 if self.compactor else None
+        )
+        session["last_prompt_tokens"] = prompt_tokens
+        
+        # Cheap local features pick the model; trivial turns skip the 70B model. Summarized turns
+        # still count towards the conversation's length
+        history_size = len(session["messages"]) + session.get("summarized_turns", 0)
+        route = self.router.route(message, history_size, session["preferences"].get("response_style"),
+                                  session.get("last_tier"))
+        session["last_model"] = route["model"]
+        session["last_tier"] = route["tier"]
+        
+        return {
+            "model": route["model"],
+            "messages": messages,
+            "max_tokens": route["max_tokens"],
+            "temperature": 0.7
+        }
+    
+    def cached_reply(self, session: Dict, payload: Dict) -> Tuple[Optional[str], Optional[str]]:
+        """(cache key, cached reply or None) for a cacheable request; (None, None) otherwise"""
+        if not self.is_cacheable(session, payload["messages"][-1]["content"]):
+            return None, None
+        cache_key = self.response_cache.key(payload)
+        return cache_key, self.response_cache.get(cache_key)
+    
+    def note_prompt_sent(self, session: Dict):
+        """Count the prompt tokens of a request that is really going to Groq"""
+        prompt_tokens = session.get("last_prompt_tokens", 0)
+        with self.stats_lock:
+            self.prompt_tokens_sent += prompt_tokens
+            self.prompt_requests += 1
+        print(f"🧮 Prompt tokens for {session.get('name') or 'user'}: {prompt_tokens}")
+    
+    def record_exchange(self, user_id: int, session: Dict, message: str, ai_response: str):
+        """Store a completed exchange in the user's session and conversation log"""
+        now = datetime.now().isoformat(timespec='seconds')
+        turns = [
+            {"role": "user", "content": message, "ts": now},
+            {"role": "assistant", "content": ai_response, "ts": now}
+        ]
+        for turn in turns:
+            message_tokens(turn)
+        session["messages"].extend(turns)
+        self.user_sessions.append_turns(user_id, turns)
+        self.user_sessions.trim_history(session)
+        self.user_sessions.mark_dirty(user_id, session)
+        session["last_activity"] = datetime.now()
+        session["message_count"] += 1
+        with self.stats_lock:
+            self.total_messages += 1
+        if self.compactor:
+            self.compactor.maybe_compact(user_id, session)
+    
+    def summarize_turns(self, summary: str, turns: List[Dict]) -> Optional[str]:
+        """Fold turns into a session summary with the fast model (runs on the compactor thread)"""
+        payload = build_summary_request(
+            summary, turns, self.router.routes["tiers"]["fast"]["model"], self.summary_tokens
+        )
+        started = time.monotonic()
+        response = self.groq.chat_completion(payload, timeout=60)
+        self.router.record(payload["model"], time.monotonic() - started, response.status_code == 200)
+        if response.status_code != 200:
+            print(f"❌ Summary request failed: {response.status_code}")
+            return None
+        return response.json()["choices"][0]["message"]["content"].strip() or None
+    
+    def _settle_fetch(self, payload: Dict, cache_key: Optional[str], started: float,
+                      outcome: Optional[Tuple[bool, str]]) -> Optional[Tuple[bool, str]]:
+        """Record the model's latency (None means the fetch raised) and cache a good reply"""
+        ok = bool(outcome and outcome[0])
+        self.router.record(payload["model"], time.monotonic() - started, ok)
+        if ok and cache_key:
+            self.response_cache.put(cache_key, outcome[1])
+        return outcome
+    
+    def answer(self, message: str, user_id: int, fetch: Callable[[Dict], Tuple[bool, str]]) -> str:
+        """Reply pipeline shared by the sync paths: response cache, one upstream fetch per identical request, history"""
+        try:
+            session = self.get_user_session(user_id)
+            payload = self.build_groq_request(message, session)
+            cache_key, cached = self.cached_reply(session, payload)
+            if cached:
+                self.record_exchange(user_id, session, message, cached)
+                return cached
             
-            headers = {
-                "Authorization": f"Bearer {self.groq_api_key}",
-                "Content-Type": "application/json"
-            }
+            def lead() -> Tuple[bool, str]:
+                self.note_prompt_sent(session)
+                started = time.monotonic()
+                try:
+                    outcome = fetch(payload)
+                except Exception:
+                    self._settle_fetch(payload, cache_key, started, None)
+                    raise
+                return self._settle_fetch(payload, cache_key, started, outcome)
             
-            data = {
-                "model": "llama-3.3-70b-versatile",
-                "messages": messages,
-                "max_tokens": 3000,
-                "temperature": 0.7
-            }
+            # Identical concurrent requests share one upstream call; each caller records the reply in its own history
+            ok, ai_response = self.groq_flights.do(self.response_cache.key(payload), lead)
+            if ok:
+                self.record_exchange(user_id, session, message, ai_response)
+            return ai_response
+        
+        except CircuitOpenError:
+            return "⚠️ AI Service is recovering from an outage. Please try again in a minute."
+        except Exception as e:
+            return f"❌ AI Service temporarily unavailable. Please try again."
+    
+    async def answer_async(self, message: str, user_id: int,
+                           fetch: Callable[[Dict], Awaitable[Tuple[bool, str]]]) -> str:
+        """Async twin of answer() for the asyncio runtime"""
+        try:
+            session = self.get_user_session(user_id)
+            payload = self.build_groq_request(message, session)
+            cache_key, cached = self.cached_reply(session, payload)
+            if cached:
+                self.record_exchange(user_id, session, message, cached)
+                return cached
             
-            response = requests.post(
-                "https://api.groq.com/openai/v1/chat/completions",
-                headers=headers,
-                json=data,
-                timeout=60
-            )
+            async def lead() -> Tuple[bool, str]:
+                self.note_prompt_sent(session)
+                started = time.monotonic()
+                try:
+                    outcome = await fetch(payload)
+                except Exception:
+                    self._settle_fetch(payload, cache_key, started, None)
+                    raise
+                return self._settle_fetch(payload, cache_key, started, outcome)
             
-            if response.status_code == 200:
-                result = response.json()
-                ai_response = result["choices"][0]["message"]["content"]
-                
-                # Update session
-                session["messages"].append({"role": "user", "content": message})
-                session["messages"].append({"role": "assistant", "content": ai_response})
-                session["last_activity"] = datetime.now()
-                session["message_count"] += 1
-                self.total_messages += 1
-                
-                return ai_response
-            else:
-                return f"❌ AI Service Error: {response.status_code}"
-                
+            ok, ai_response = await self.groq_flights.do_async(self.response_cache.key(payload), lead)
+            if ok:
+                self.record_exchange(user_id, session, message, ai_response)
+            return ai_response
+        
+        except CircuitOpenError:
+            return "⚠️ AI Service is recovering from an outage. Please try again in a minute."
         except Exception as e:
             return f"❌ AI Service temporarily unavailable. Please try again."
     
-    def send_message(self, chat_id: int, text: str) -> bool:
-        """Send message via Telegram API"""
+    def call_groq_ai(self, message: str, user_id: int) -> str:
+        """Call Groq AI for intelligent responses"""
+        def fetch(payload: Dict) -> Tuple[bool, str]:
+            response = self.groq.chat_completion(payload, timeout=60)
+            if response.status_code != 200:
+                return False, f"❌ AI Service Error: {response.status_code}"
+            return True, response.json()["choices"][0]["message"]["content"]
+        
+        return self.answer(message, user_id, fetch)
+    
+    def call_groq_ai_streaming(self, message: str, user_id: int, editor: StreamingEditor) -> str:
+        """Call Groq AI in streaming mode, feeding tokens to the message editor"""
+        def fetch(payload: Dict) -> Tuple[bool, str]:
+            response = self.groq.chat_completion(dict(payload, stream=True), timeout=60, stream=True)
+            try:
+                with response:
+                    if response.status_code != 200:
+                        return False, f"❌ AI Service Error: {response.status_code}"
+                    
+                    for delta in iter_stream_deltas(response):
+                        editor.feed(delta)
+            except Exception:
+                if editor.text:
+                    # Keep what already reached the user, flagged for everyone sharing this flight
+                    return False, editor.text + INCOMPLETE_REPLY_NOTE
+                raise
+            
+            if not editor.text:
+                return False, "❌ AI Service temporarily unavailable. Please try again."
+            return True, editor.text
+        
+        # The first caller streams; identical concurrent callers get its final text
+        return self.answer(message, user_id, fetch)
+    
+    async def call_groq_ai_async(self, runtime, message: str, user_id: int) -> str:
+        """Call Groq AI from the asyncio runtime"""
+        async def fetch(payload: Dict) -> Tuple[bool, str]:
+            status, result = await self.groq.chat_completion_async(runtime, payload, timeout=60)
+            if status != 200:
+                return False, f"❌ AI Service Error: {status}"
+            return True, result["choices"][0]["message"]["content"]
+        
+        return await self.answer_async(message, user_id, fetch)
+    
+    def telegram_request(self, chat_id: int, method: str, **kwargs):
+        """Queue a Telegram API call on the rate-limited outbound scheduler"""
+        return self.outbound.submit(
+            chat_id,
+            lambda: self.http.post(f"{self.telegram_api}/{method}", timeout=30, **kwargs)
+        )
+    
+    def send_message(self, chat_id: int, text: str, wait: bool = True) -> bool:
+        """Send message via Telegram API (wait=False queues it and returns at once)"""
+        if self.async_runtime:
+            return self.async_runtime.call(self.async_runtime.send_message(chat_id, text))
         try:
-            response = requests.post(
-                f"https://api.telegram.org/bot{self.bot_token}/sendMessage",
+            future = self.telegram_request(
+                chat_id,
+                'sendMessage',
                 json={
                     'chat_id': chat_id,
                     'text': text,
                     'parse_mode': 'HTML'
-                },
-                timeout=30
+                }
             )
-            return response.status_code == 200
+            if not wait:
+                return True
+            return future.result().status_code == 200
         except:
             return False
     
-    def send_voice_message(self, chat_id: int, voice_file_path: str) -> bool:
-        """Send voice message via Telegram API"""
+    def send_tracked_message(self, chat_id: int, text: str) -> Optional[int]:
+        """Send message via Telegram API and return its message_id for later edits"""
         try:
-            with open(voice_file_path, 'rb') as voice_file:
-                response = requests.post(
-                    f"https://api.telegram.org/bot{self.bot_token}/sendVoice",
-                    data={
-                        'chat_id': chat_id
-                    },
-                    files={
-                        'voice': voice_file
-                    },
-                    timeout=30
-                )
+            response = self.telegram_request(
+                chat_id,
+                'sendMessage',
+                json={
+                    'chat_id': chat_id,
+                    'text': text,
+                    'parse_mode': 'HTML'
+                }
+            ).result()
+            if response.status_code == 200:
+                return response.json()['result']['message_id']
+            return None
+        except:
+            return None
+    
+    def edit_message_text(self, chat_id: int, message_id: int, text: str, parse_mode: Optional[str] = 'HTML') -> bool:
+        """Replace the text of a sent message via Telegram API"""
+        try:
+            payload = {
+                'chat_id': chat_id,
+                'message_id': message_id,
+                'text': text
+            }
+            if parse_mode:
+                payload['parse_mode'] = parse_mode
+            
+            response = self.telegram_request(chat_id, 'editMessageText', json=payload).result()
             return response.status_code == 200
+        except:
+            return False
+    
+    def send_voice_message(self, chat_id: int, voice: Union[str, GeneratedFile], cache_key: Optional[str] = None) -> bool:
+        """Send voice message (file path or in-memory GeneratedFile) via Telegram API; temp files are deleted afterwards"""
+        try:
+            return self._remember_upload(cache_key, self._send_voice_message(chat_id, voice))
+        finally:
+            self.temp_janitor.release(voice)
+    
+    def _send_voice_message(self, chat_id: int, voice: Union[str, GeneratedFile]) -> Optional[Dict]:
+        if self.async_runtime:
+            return self.async_runtime.call(self.async_runtime.send_voice_message(chat_id, voice))
+        def upload():
+            return self.http.post_file(f"{self.telegram_api}/sendVoice", {'chat_id': chat_id}, 'voice', voice)
+        try:
+            return _sent_message(self.outbound.submit(chat_id, upload).result())
         except Exception as e:
             print(f"❌ Voice send error: {e}")
+            return None
+    
+    def send_document(self, chat_id: int, document: Union[str, GeneratedFile], caption: str = "",
+                      cache_key: Optional[str] = None) -> bool:
+        """Send document (file path or in-memory GeneratedFile) via Telegram API; temp files are deleted afterwards"""
+        try:
+            return self._remember_upload(cache_key, self._send_document(chat_id, document, caption))
+        finally:
+            self.temp_janitor.release(document)
+    
+    def _send_document(self, chat_id: int, document: Union[str, GeneratedFile], caption: str = "") -> Optional[Dict]:
+        if self.async_runtime:
+            return self.async_runtime.call(self.async_runtime.send_document(chat_id, document, caption))
+        def upload():
+            return self.http.post_file(f"{self.telegram_api}/sendDocument",
+                                       {'chat_id': chat_id, 'caption': caption}, 'document', document)
+        try:
+            return _sent_message(self.outbound.submit(chat_id, upload).result())
+        except Exception as e:
+            print(f"❌ Document send error: {e}")
+            return None
+    
+    def _remember_upload(self, cache_key: Optional[str], message: Optional[Dict]) -> bool:
+        """Cache the file_id of a successful upload under its content key"""
+        if message is None:
+            return False
+        file_id = sent_file_id(message)
+        if cache_key and file_id:
+            self.file_cache.put(cache_key, file_id)
+        return True
+    
+    def _send_cached(self, chat_id: int, method: str, field: str, cache_key: str, extra: Optional[Dict] = None) -> bool:
+        """Re-send a previously uploaded file by file_id; False on a miss"""
+        file_id = self.file_cache.get(cache_key)
+        if file_id is None:
             return False
+        sent = self._send_file_id(chat_id, method, field, file_id, extra)
+        if not sent:
+            # Stale or rejected file_id: fall back to building and uploading again
+            self.file_cache.forget(cache_key)
+        return sent
     
-    def send_document(self, chat_id: int, document_path: str, caption: str = "") -> bool:
-        """Send document via Telegram API"""
+    def _send_file_id(self, chat_id: int, method: str, field: str, file_id: str, extra: Optional[Dict] = None) -> bool:
+        """Send a file Telegram already has, by file_id"""
+        if self.async_runtime:
+            return self.async_runtime.call(self.async_runtime.send_file_id(method, field, chat_id, file_id, extra))
         try:
-            with open(document_path, 'rb') as doc_file:
-                response = requests.post(
-                    f"https://api.telegram.org/bot{self.bot_token}/sendDocument",
+            future = self.telegram_request(chat_id, method, json={'chat_id': chat_id, field: file_id, **(extra or {})})
+            return future.result().status_code == 200
+        except Exception as e:
+            print(f"❌ Cached file send error: {e}")
+            return False
+    
+    def send_document_group(self, chat_id: int, documents: List[Tuple[Union[str, GeneratedFile], str, Optional[str]]]) -> bool:
+        """Send up to 10 documents as one sendMediaGroup album.
+        
+        Each entry is (file_id or GeneratedFile, caption, cache_key); uploads are cached by cache_key.
+        """
+        if len(documents) == 1:
+            document, caption, cache_key = documents[0]
+            if isinstance(document, GeneratedFile):
+                return self.send_document(chat_id, document, caption, cache_key=cache_key)
+            return self._send_file_id(chat_id, 'sendDocument', 'document', document, {'caption': caption})
+        
+        media = []
+        files = {}
+        for index, (document, caption, _) in enumerate(documents):
+            if isinstance(document, GeneratedFile):
+                files[f"file{index}"] = document
+                media.append({'type': 'document', 'media': f"attach://file{index}", 'caption': caption})
+            else:
+                media.append({'type': 'document', 'media': document, 'caption': caption})
+        
+        def upload():
+            # Path-backed files are reopened per attempt so a rate-limited upload can be retried
+            with ExitStack() as stack:
+                parts = {
+                    name: (file.name, file.data if file.data is not None else stack.enter_context(open(file.path, 'rb')))
+                    for name, file in files.items()
+                }
+                return self.http.post(
+                    f"{self.telegram_api}/sendMediaGroup",
                     data={
                         'chat_id': chat_id,
-                        'caption': caption
-                    },
-                    files={
-                        'document': doc_file
+                        'media': json.dumps(media)
                     },
-                    timeout=30
+                    files=parts,
+                    timeout=60
                 )
-            return response.status_code == 200
+        try:
+            if self.async_runtime:
+                messages = self.async_runtime.call(self.async_runtime.send_media_group(chat_id, media, files))
+            else:
+                response = self.outbound.submit(chat_id, upload).result()
+                messages = response.json().get('result') if response.status_code == 200 else None
         except Exception as e:
-            print(f"❌ Document send error: {e}")
+            print(f"❌ Media group send error: {e}")
+            messages = None
+        finally:
+            for file in files.values():
+                self.temp_janitor.release(file)
+        
+        if messages is None:
+            # A stale cached file_id fails the whole album; make the next attempt rebuild
+            for document, _, cache_key in documents:
+                if cache_key and not isinstance(document, GeneratedFile):
+                    self.file_cache.forget(cache_key)
             return False
+        if not isinstance(messages, list):
+            # Sent, but without the per-item messages there are no file_ids to remember
+            print(f"⚠️ Unexpected sendMediaGroup result: {type(messages).__name__}")
+            return True
+        for (document, _, cache_key), message in zip(documents, messages):
+            if isinstance(document, GeneratedFile) and isinstance(message, dict):
+                self._remember_upload(cache_key, message)
+        return True
     
-    def process_message(self, user_id: int, user_name: str, username: str, text: str):
-        """Process incoming message with multi-user support"""
+    def send_cached_document(self, chat_id: int, cache_key: str, caption: str = "") -> bool:
+        """Send a cached document by file_id if this exact file was uploaded before"""
+        return self._send_cached(chat_id, 'sendDocument', 'document', cache_key, {'caption': caption})
+    
+    def send_cached_voice(self, chat_id: int, cache_key: str) -> bool:
+        """Send a cached voice message by file_id if this exact text was voiced before"""
+        return self._send_cached(chat_id, 'sendVoice', 'voice', cache_key)
+    
+    def prepare_session(self, user_id: int, user_name: str, username: str, text: str) -> Dict:
+        """Log an incoming message and refresh the sender's session details"""
         print(f"📩 @{username or 'N/A'} ({user_name}): {text}")
         
         session = self.get_user_session(user_id)
-        if not session["name"]:
-            session["name"] = user_name
-        if username:
-            session["username"] = username
+        if not session["name"] or (username and session["username"] != username):
+            if not session["name"]:
+                session["name"] = user_name
+            if username:
+                session["username"] = username
+            self.user_sessions.mark_dirty(user_id, session)
+        return session
+    
+    def format_ai_reply(self, ai_response: str) -> List[str]:
+        """Split an AI response into Telegram-sized messages"""
+        if len(ai_response) > 4000:
+            parts = [ai_response[i:i+4000] for i in range(0, len(ai_response), 4000)]
+            return [f"🧠 {self.assistant_name} AI (Part {i+1}/{len(parts)}):\n\n{part}" for i, part in enumerate(parts)]
+        return [f"🧠 {self.assistant_name} AI:\n\n{ai_response}"]
+    
+    def parse_update(self, update: Dict) -> Optional[Tuple[int, Tuple]]:
+        """Extract (ordering key, process_message args) from a Telegram update"""
+        if 'message' not in update:
+            return None
+        
+        msg = update['message']
+        user_id = msg['from']['id']
+        user_name = msg['from'].get('first_name', 'User')
+        username = msg['from'].get('username')
+        text = msg.get('text', '')
+        
+        if not text:
+            return None
+        return user_id, (user_id, user_name, username, text)
+    
+    def process_message(self, user_id: int, user_name: str, username: str, text: str):
+        """Process incoming message with multi-user support"""
+        session = self.prepare_session(user_id, user_name, username, text)
         
         # Handle commands
         if text.lower() == '/start':
@@ -269,13 +721,15 @@ Hello {user_name}! I'm {self.assistant_name}, your advanced AI assistant with co
 /help - Show all capabilities
 /stats - Bot statistics
 /myinfo - Your session info
+/export [xlsx|jsonl] - Download your full conversation
+/nocache - Toggle cached answers for common questions
 /clear - Clear your conversation
 /voice <text> - Convert text to voice
 /note <title> - Create markdown note
 /pdf <title> - Generate PDF document
 /word <title> - Create Word document
 /excel <title> - Generate Excel sheet
-/report <title> - Generate multi-format report
+/report <title> [| pdf, word, markdown] - Generate multi-format report
 
 🌟 <b>AI Capabilities:</b>
 🧠 Advanced reasoning & analysis
@@ -310,6 +764,8 @@ Ask me anything - I'm ready to help you personally with text and media! 🚀"""
 /help - Show this help
 /stats - Global bot statistics
 /myinfo - Your session information
+/export [xlsx|jsonl] - Download your full conversation
+/nocache - Toggle cached answers for common questions
 /clear - Clear your conversation
 
 🎵 <b>Media Commands:</b>
@@ -318,7 +774,7 @@ Ask me anything - I'm ready to help you personally with text and media! 🚀"""
 /pdf <title> - Generate PDF document
 /word <title> - Create Word document
 /excel <title> - Generate Excel sheet
-/report <title> - Generate multi-format report
+/report <title> [| pdf, word, markdown] - Generate multi-format report
 
 🌟 <b>Multi-User Features:</b>
 👥 <b>Individual Sessions:</b> Each user has private conversation
@@ -343,6 +799,7 @@ Ask me anything - I'm ready to help you personally with text and media! 🚀"""
 • "/word Meeting Notes" - Create Word doc
 • "/excel Project Data" - Generate Excel
 • "/report Summary" - Get all formats
+• "/report Summary | pdf, word" - Pick formats
 
 💡 <b>Multi-User Benefits:</b>
 ✅ Private conversations with AI
@@ -364,12 +821,15 @@ Ask me anything - I have complete intelligence and media capabilities for you!""
             # Extract text for voice conversion
             voice_text = text[7:].strip()  # Remove "/voice " prefix
             if voice_text:
+                cache_key = self.file_cache.key(user_id, 'voice', '', voice_text)
+                if self.send_cached_voice(user_id, cache_key):
+                    return
                 self.send_message(user_id, "🎵 Converting text to voice...")
-                voice_file = self.media_handler.text_to_speech(voice_text, user_id)
+                voice_file, error = self.tts.synthesize(voice_text, f"voice_{user_id}")
                 if voice_file:
-                    self.send_voice_message(user_id, voice_file)
+                    self.send_voice_message(user_id, voice_file, cache_key=cache_key)
                 else:
-                    self.send_message(user_id, "❌ Failed to generate voice message")
+                    self.send_message(user_id, error or "❌ Failed to generate voice message")
             else:
                 self.send_message(user_id, "❌ Please provide text to convert to voice\nExample: /voice Hello world")
             return
@@ -378,17 +838,20 @@ Ask me anything - I have complete intelligence and media capabilities for you!""
             # Extract title for note
             note_title = text[6:].strip()  # Remove "/note " prefix
             if note_title:
-                self.send_message(user_id, "📝 Creating markdown note...")
                 # Get last AI response or create default content
                 last_messages = session.get("messages", [])
                 content = "This is your personalized note generated by ATLAS AI."
                 if last_messages:
                     content = last_messages[-1].get("content", content) if last_messages[-1].get("role") == "assistant" else content
                 
+                cache_key = self.file_cache.key(user_id, 'note', note_title, content)
+                if self.send_cached_document(user_id, cache_key, f"📝 Your note: {note_title}"):
+                    return
+                self.send_message(user_id, "📝 Creating markdown note...")
                 note_file = self.media_handler.generate_markdown_note(note_title, content, user_id)
                 if note_file:
                     file_info = self.media_handler.get_file_info(note_file)
-                    self.send_document(user_id, note_file, f"📝 Your note: {note_title}")
+                    self.send_document(user_id, note_file, f"📝 Your note: {note_title}", cache_key=cache_key)
                 else:
                     self.send_message(user_id, "❌ Failed to generate note")
             else:
@@ -399,19 +862,22 @@ Ask me anything - I have complete intelligence and media capabilities for you!""
             # Extract title for PDF
             pdf_title = text[5:].strip()  # Remove "/pdf " prefix
             if pdf_title:
-                self.send_message(user_id, "📄 Generating PDF document...")
                 # Get last AI response or create default content
                 last_messages = session.get("messages", [])
                 content = "This is your personalized PDF document generated by ATLAS AI."
                 if last_messages:
                     content = last_messages[-1].get("content", content) if last_messages[-1].get("role") == "assistant" else content
                 
-                pdf_file = self.media_handler.generate_pdf_document(pdf_title, content, user_id)
+                cache_key = self.file_cache.key(user_id, 'pdf', pdf_title, content)
+                if self.send_cached_document(user_id, cache_key, f"📄 Your PDF: {pdf_title}"):
+                    return
+                self.send_message(user_id, "📄 Generating PDF document...")
+                pdf_file, error = self.document_jobs.run(self.media_handler.generate_pdf_document, pdf_title, content, user_id)
                 if pdf_file:
                     file_info = self.media_handler.get_file_info(pdf_file)
-                    self.send_document(user_id, pdf_file, f"📄 Your PDF: {pdf_title}")
+                    self.send_document(user_id, pdf_file, f"📄 Your PDF: {pdf_title}", cache_key=cache_key)
                 else:
-                    self.send_message(user_id, "❌ Failed to generate PDF")
+                    self.send_message(user_id, error or "❌ Failed to generate PDF")
             else:
                 self.send_message(user_id, "❌ Please provide a title for the PDF\nExample: /pdf Business Plan")
             return
@@ -420,19 +886,22 @@ Ask me anything - I have complete intelligence and media capabilities for you!""
             # Extract title for Word document
             word_title = text[6:].strip()  # Remove "/word " prefix
             if word_title:
-                self.send_message(user_id, "📝 Creating Word document...")
                 # Get last AI response or create default content
                 last_messages = session.get("messages", [])
                 content = "This is your personalized Word document generated by ATLAS AI."
                 if last_messages:
                     content = last_messages[-1].get("content", content) if last_messages[-1].get("role") == "assistant" else content
                 
-                word_file = self.media_handler.generate_word_document(word_title, content, user_id)
+                cache_key = self.file_cache.key(user_id, 'word', word_title, content)
+                if self.send_cached_document(user_id, cache_key, f"📝 Your Word document: {word_title}"):
+                    return
+                self.send_message(user_id, "📝 Creating Word document...")
+                word_file, error = self.document_jobs.run(self.media_handler.generate_word_document, word_title, content, user_id)
                 if word_file:
                     file_info = self.media_handler.get_file_info(word_file)
-                    self.send_document(user_id, word_file, f"📝 Your Word document: {word_title}")
+                    self.send_document(user_id, word_file, f"📝 Your Word document: {word_title}", cache_key=cache_key)
                 else:
-                    self.send_message(user_id, "❌ Failed to generate Word document")
+                    self.send_message(user_id, error or "❌ Failed to generate Word document")
             else:
                 self.send_message(user_id, "❌ Please provide a title for the Word document\nExample: /word Meeting Notes")
             return
@@ -441,7 +910,6 @@ Ask me anything - I have complete intelligence and media capabilities for you!""
             # Extract title for Excel sheet
             excel_title = text[7:].strip()  # Remove "/excel " prefix
             if excel_title:
-                self.send_message(user_id, "📊 Generating Excel sheet...")
                 # Create sample data
                 data = {
                     "User Name": session.get("name", "Unknown"),
@@ -452,37 +920,66 @@ Ask me anything - I have complete intelligence and media capabilities for you!""
                     "Generated By": f"{self.assistant_name} AI"
                 }
                 
-                excel_file = self.media_handler.generate_excel_sheet(excel_title, data, user_id)
+                cache_key = self.file_cache.key(user_id, 'excel', excel_title, data)
+                if self.send_cached_document(user_id, cache_key, f"📊 Your Excel sheet: {excel_title}"):
+                    return
+                self.send_message(user_id, "📊 Generating Excel sheet...")
+                excel_file, error = self.document_jobs.run(self.media_handler.generate_excel_sheet, excel_title, data, user_id)
                 if excel_file:
                     file_info = self.media_handler.get_file_info(excel_file)
-                    self.send_document(user_id, excel_file, f"📊 Your Excel sheet: {excel_title}")
+                    self.send_document(user_id, excel_file, f"📊 Your Excel sheet: {excel_title}", cache_key=cache_key)
                 else:
-                    self.send_message(user_id, "❌ Failed to generate Excel sheet")
+                    self.send_message(user_id, error or "❌ Failed to generate Excel sheet")
             else:
                 self.send_message(user_id, "❌ Please provide a title for the Excel sheet\nExample: /excel Project Data")
             return
         
         elif text.lower().startswith('/report '):
-            # Extract title for report
-            report_title = text[8:].strip()  # Remove "/report " prefix
-            if report_title:
-                self.send_message(user_id, "📋 Generating multi-format report...")
+            # "/report <title>" or "/report <title> | pdf, word"
+            report_title, _, format_text = text[8:].partition('|')
+            report_title = report_title.strip()
+            formats = parse_report_formats(format_text)
+            if report_title and formats:
                 # Get last AI response or create default content
                 last_messages = session.get("messages", [])
                 content = "This is your personalized report generated by ATLAS AI."
                 if last_messages:
                     content = last_messages[-1].get("content", content) if last_messages[-1].get("role") == "assistant" else content
                 
-                files = self.media_handler.generate_summary_report(report_title, content, user_id)
-                if files:
-                    for file_type, file_path in files.items():
-                        file_info = self.media_handler.get_file_info(file_path)
-                        self.send_document(user_id, file_path, f"📋 Your {file_type.upper()} report: {report_title}")
-                        time.sleep(1)  # Small delay between files
-                else:
-                    self.send_message(user_id, "❌ Failed to generate report")
+                cache_keys = {fmt: self.file_cache.key(user_id, f"report-{fmt}", report_title, content) for fmt in formats}
+                reports = {}
+                for fmt in formats:
+                    file_id = self.file_cache.get(cache_keys[fmt])
+                    if file_id:
+                        reports[fmt] = file_id
+                
+                # Formats build side by side in the document workers
+                missing = [fmt for fmt in formats if fmt not in reports]
+                errors = []
+                if missing:
+                    self.send_message(user_id, f"📋 Generating {', '.join(fmt.upper() for fmt in missing)} report...")
+                    results = self.document_jobs.run_many([
+                        (self.media_handler.generate_report_file, (fmt, report_title, content, user_id))
+                        for fmt in missing
+                    ])
+                    for fmt, (report_file, error) in zip(missing, results):
+                        if report_file:
+                            reports[fmt] = report_file
+                        elif error not in errors:
+                            errors.append(error or f"❌ Failed to generate {fmt.upper()} report")
+                
+                documents = [
+                    (reports[fmt], f"📋 Your {fmt.upper()} report: {report_title}", cache_keys[fmt])
+                    for fmt in formats if fmt in reports
+                ]
+                if documents and not self.send_document_group(user_id, documents):
+                    errors.append("❌ Failed to send report")
+                if errors or not documents:
+                    self.send_message(user_id, "\n".join(errors) or "❌ Failed to generate report")
+            elif report_title:
+                self.send_message(user_id, "❌ Unknown report format. Choose from: markdown, pdf, word\nExample: /report Summary | pdf, word")
             else:
-                self.send_message(user_id, "❌ Please provide a title for the report\nExample: /report Summary")
+                self.send_message(user_id, "❌ Please provide a title for the report\nExample: /report Summary | pdf, word")
             return
         
         elif text.lower() == '/stats':
@@ -495,6 +992,52 @@ Ask me anything - I have complete intelligence and media capabilities for you!""
             self.send_message(user_id, user_info)
             return
         
+        elif text.lower() == '/export' or text.lower().startswith('/export '):
+            export_format = text[7:].strip().lower() or 'xlsx'
+            if export_format not in EXPORT_FORMATS:
+                self.send_message(user_id, "❌ Choose an export format: xlsx or jsonl\nExample: /export jsonl")
+                return
+            
+            self.send_message(user_id, "📦 Exporting your conversation...")
+            export_path = os.path.join(
+                self.media_handler.temp_dir,
+                f"conversation_{user_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{export_format}"
+            )
+            try:
+                # Rows stream from storage straight into the file, so long histories use flat memory
+                turns = self.user_sessions.iter_turns(user_id)
+                if export_format == 'xlsx':
+                    count = export_xlsx(turns, export_path, f"{self.assistant_name} Conversation")
+                else:
+                    count = export_jsonl(turns, export_path)
+            except Exception as e:
+                print(f"❌ Export error: {e}")
+                self.temp_janitor.release(export_path)
+                self.send_message(user_id, "❌ Failed to export conversation")
+                return
+            
+            if count and not self.user_sessions.keeps_turn_log:
+                # Without SESSION_DB_PATH older turns only live on in the summary
+                self.send_document(
+                    user_id, export_path,
+                    f"📦 Your recent conversation: {count} entries (partial - older messages are kept only as a summary)"
+                )
+            elif count:
+                self.send_document(user_id, export_path, f"📦 Your conversation: {count} messages")
+            else:
+                self.temp_janitor.release(export_path)
+                self.send_message(user_id, "📭 No conversation to export yet")
+            return
+        
+        elif text.lower() == '/nocache':
+            session["cache_bypass"] = not session.get("cache_bypass")
+            self.user_sessions.mark_dirty(user_id, session)
+            if session["cache_bypass"]:
+                self.send_message(user_id, "🔄 Response cache off: every question goes to the AI fresh. Send /nocache again to turn it back on.")
+            else:
+                self.send_message(user_id, "♻️ Response cache on: common first questions are answered instantly.")
+            return
+        
         elif text.lower() == '/clear':
             if user_id in self.user_sessions:
                 del self.user_sessions[user_id]
@@ -503,19 +1046,52 @@ Ask me anything - I have complete intelligence and media capabilities for you!""
             return
         
         # Process with AI
-        self.send_message(user_id, "🧠 Processing with Atlas AI intelligence...")
+        if self.stream_responses and not self.async_runtime:
+            placeholder_id = self.send_tracked_message(user_id, "🧠 Processing with Atlas AI intelligence...")
+            if placeholder_id:
+                self.reply_streaming(user_id, placeholder_id, text)
+                return
+        else:
+            self.send_message(user_id, "🧠 Processing with Atlas AI intelligence...")
         
         ai_response = self.call_groq_ai(text, user_id)
         
-        # Split long messages
-        if len(ai_response) > 4000:
-            parts = [ai_response[i:i+4000] for i in range(0, len(ai_response), 4000)]
-            for i, part in enumerate(parts):
-                self.send_message(user_id, f"🧠 {self.assistant_name} AI (Part {i+1}/{len(parts)}):\n\n{part}")
-                if i < len(parts) - 1:
-                    time.sleep(1)
-        else:
-            self.send_message(user_id, f"🧠 {self.assistant_name} AI:\n\n{ai_response}")
+        # Split long messages; the outbound scheduler paces the parts per chat
+        for reply in self.format_ai_reply(ai_response):
+            self.send_message(user_id, reply, wait=False)
+    
+    def reply_streaming(self, user_id: int, placeholder_id: int, text: str):
+        """Stream the AI reply into the placeholder, then send any overflow parts"""
+        editor = StreamingEditor(
+            self, user_id, placeholder_id,
+            prefix=f"🧠 {self.assistant_name} AI:\n\n",
+            min_interval=self.stream_edit_interval
+        )
+        ai_response = self.call_groq_ai_streaming(text, user_id, editor)
+        
+        # Final edit uses HTML like regular replies; fall back to plain text if it does not parse
+        replies = self.format_ai_reply(ai_response)
+        if not self.edit_message_text(user_id, placeholder_id, replies[0]):
+            self.edit_message_text(user_id, placeholder_id, replies[0], parse_mode=None)
+        
+        for reply in replies[1:]:
+            self.send_message(user_id, reply, wait=False)
+    
+    async def process_message_async(self, runtime, user_id: int, user_name: str, username: str, text: str):
+        """Process incoming message on the asyncio runtime"""
+        # Commands build files or audio, so they keep the sync handlers on a thread
+        if text.startswith('/'):
+            await runtime.run_sync(self.process_message, user_id, user_name, username, text)
+            return
+        
+        self.prepare_session(user_id, user_name, username, text)
+        await runtime.send_message(user_id, "🧠 Processing with Atlas AI intelligence...")
+        
+        ai_response = await self.call_groq_ai_async(runtime, text, user_id)
+        
+        # The runtime's outbound scheduler paces the parts per chat
+        for reply in self.format_ai_reply(ai_response):
+            await runtime.send_message(user_id, reply)
     
     def health_check(self):
         """Health check endpoint for Render"""
@@ -526,6 +1102,16 @@ Ask me anything - I have complete intelligence and media capabilities for you!""
             "platform": "Render",
             "active_users": len(self.active_users),
             "total_messages": self.total_messages,
+            "queued_updates": self.dispatcher.get_stats()['queued'],
+            "http": self.http.get_stats(),
+            "groq": self.groq.get_stats(),
+            "temp_files": self.temp_janitor.get_stats(),
+            "file_cache": self.file_cache.get_stats(),
+            "response_cache": self.response_cache.get_stats(),
+            "groq_flights": self.groq_flights.get_stats(),
+            "model_routing": self.router.get_stats(),
+            "memory_compactor": self.compactor.get_stats() if self.compactor else None,
+            "tts": self.tts.get_stats(),
             "uptime": str(datetime.now() - self.start_time)
         }
     
@@ -548,7 +1134,7 @@ Ask me anything - I have complete intelligence and media capabilities for you!""
         
         # Test connection
         try:
-            response = requests.get(f"https://api.telegram.org/bot{self.bot_token}/getMe")
+            response = self.http.get(f"{self.telegram_api}/getMe")
             if response.status_code == 200:
                 bot_info = response.json()
                 print(f"✅ Connected to bot: @{bot_info['result']['username']}")
@@ -559,41 +1145,82 @@ Ask me anything - I have complete intelligence and media capabilities for you!""
             print(f"❌ Connection error: {e}")
             return
         
+        # Polling only works once no webhook is registered
+        delete_webhook(self)
+        
+        if self.runtime_mode == 'async':
+            self.run_async()
+            return
+        
+        # Updates run on the worker pool so a slow user never blocks polling
+        self.dispatcher.start()
+        
         # Main polling loop
+        failures = 0
         while True:
             try:
                 params = {'offset': self.last_update_id + 1, 'timeout': 30}
-                response = requests.get(
-                    f"https://api.telegram.org/bot{self.bot_token}/getUpdates",
+                response = self.http.get(
+                    f"{self.telegram_api}/getUpdates",
                     params=params,
                     timeout=35
                 )
                 
-                if response.status_code == 200:
-                    data = response.json()
-                    
-                    if data['ok'] and data['result']:
-                        for update in data['result']:
-                            self.last_update_id = update['update_id']
-                            
-                            if 'message' in update:
-                                msg = update['message']
-                                user_id = msg['from']['id']
-                                user_name = msg['from'].get('first_name', 'User')
-                                username = msg['from'].get('username')
-                                text = msg.get('text', '')
-                                
-                                if text:
-                                    self.process_message(user_id, user_name, username, text)
+                if response.status_code != 200:
+                    # 401/409/5xx come back at once; don't hammer Telegram
+                    failures += 1
+                    delay = poll_backoff(failures)
+                    print(f"❌ getUpdates failed: {response.status_code}, retrying in {delay:.0f}s")
+                    time.sleep(delay)
+                    continue
+                failures = 0
+                
+                data = response.json()
+                
+                if data['ok'] and data['result']:
+                    for update in data['result']:
+                        self.last_update_id = update['update_id']
+                        
+                        parsed = self.parse_update(update)
+                        if parsed:
+                            user_id, args = parsed
+                            self.dispatcher.submit(user_id, self.process_message, *args)
                 
             except requests.exceptions.Timeout:
                 print("⏳ Polling timeout...")
             except KeyboardInterrupt:
                 print("\n👋 Bot stopped")
+                self.dispatcher.stop(wait=False)
+                if self.compactor:
+                    self.compactor.close()
+                self.user_sessions.close()
                 break
             except Exception as e:
                 print(f"❌ Error: {e}")
                 time.sleep(5)
+    
+    def run_async(self):
+        """Run polling, Groq calls and Telegram sends on an asyncio event loop"""
+        from async_runtime import AsyncBotRuntime  # aiohttp is only needed in async mode
+        
+        runtime = AsyncBotRuntime(
+            self,
+            max_in_flight=int(os.getenv('ASYNC_MAX_IN_FLIGHT', 500)),
+            executor_workers=int(os.getenv('BOT_WORKERS', 8))
+        )
+        try:
+            asyncio.run(runtime.run())
+        except KeyboardInterrupt:
+            print("\n👋 Bot stopped")
+
+def _sent_message(response) -> Optional[Dict]:
+    """The sent Message from a Telegram upload response, or None on failure"""
+    if response.status_code != 200:
+        return None
+    try:
+        return response.json().get('result') or {}
+    except ValueError:
+        return {}
 
 if __name__ == "__main__":
     bot = AtlasAITelegramBot()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Context Builder for ATLAS AI Telegram Bot
+Assembles Groq prompts within a token budget, newest history first
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+_TOKEN_PIECES = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+MESSAGE_OVERHEAD = 4  # role and separator tokens per chat message
+
+def count_tokens(text: str) -> int:
+    """Estimate tokens locally: ~4 characters per word piece, one per symbol"""
+    tokens = 0
+    for piece in _TOKEN_PIECES.findall(text):
+        tokens += (len(piece) + 3) // 4 if piece[0].isalnum() or piece[0] == '_' else 1
+    return tokens
+
+def message_tokens(message: Dict) -> int:
+    """Token count for a history message, cached on the message itself"""
+    tokens = message.get("tokens")
+    if tokens is None:
+        tokens = count_tokens(message.get("content", "")) + MESSAGE_OVERHEAD
+        message["tokens"] = tokens
+    return tokens
+
+class ContextBuilder:
+    """Build chat messages that fit a token budget"""
+
+    def __init__(self, static_head: str, static_tail: str = "", token_budget: int = 6000, max_messages: int = 8):
+        # The static parts of the system prompt never change, so they are counted once
+        self.static_head = static_head
+        self.static_tail = static_tail
+        self.static_tokens = count_tokens(static_head) + count_tokens(static_tail) + MESSAGE_OVERHEAD
+        self.token_budget = token_budget
+        self.max_messages = max_messages
+
+    def system_prompt(self, dynamic_context: str, summary: str = "") -> str:
+        """Join the cached static prompt with per-request context and the conversation summary"""
+        parts = [self.static_head, dynamic_context]
+        if summary:
+            parts.append(f"Summary of the earlier conversation:\n{summary}")
+        if self.static_tail:
+            parts.append(self.static_tail)
+        return "\n\n".join(parts)
+
+    def build(self, dynamic_context: str, history: List[Dict], message: str,
+              summary: str = "", max_messages: Optional[int] = None) -> Tuple[List[Dict], int]:
+        """Return (messages, prompt tokens), newest history first; `max_messages` overrides the limit (0 = budget only)"""
+        if max_messages is None:
+            max_messages = self.max_messages
+        used = self.static_tokens + count_tokens(dynamic_context) + count_tokens(message) + MESSAGE_OVERHEAD
+        if summary:
+            used += count_tokens(summary) + 8  # plus the heading line
+
+        selected = []
+        for past in reversed(history[-max_messages:] if max_messages else history):
+            tokens = message_tokens(past)
+            if used + tokens > self.token_budget:
+                break
+            selected.append({"role": past["role"], "content": past["content"]})
+            used += tokens
+        selected.reverse()
+
+        messages = [{"role": "system", "content": self.system_prompt(dynamic_context, summary)}]
+        messages.extend(selected)
+        messages.append({"role": "user", "content": message})
+        return messages, used
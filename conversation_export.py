@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Conversation Export for ATLAS AI Telegram Bot
+Streams a user's history to XLSX (openpyxl write-only) or JSONL with flat memory use
+"""
+
+import json
+from typing import Dict, Iterable
+from context_builder import message_tokens
+
+EXPORT_FORMATS = ('xlsx', 'jsonl')
+XLSX_CELL_LIMIT = 32767  # Excel rejects longer cell values
+
+def _row(message: Dict) -> Dict:
+    """Normalised export row for a history message"""
+    return {
+        "ts": message.get("ts") or "",
+        "role": message.get("role", ""),
+        "content": message.get("content", ""),
+        "tokens": message.get("tokens") or message_tokens(dict(message))
+    }
+
+def export_jsonl(messages: Iterable[Dict], path: str) -> int:
+    """Write one JSON object per message; returns the number of rows"""
+    count = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        for message in messages:
+            f.write(json.dumps(_row(message), ensure_ascii=False))
+            f.write('\n')
+            count += 1
+    return count
+
+def export_xlsx(messages: Iterable[Dict], path: str, title: str = "Conversation") -> int:
+    """Write messages to a write-only workbook, which keeps no rows in memory; returns the row count"""
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+    from doc_templates import excel_styles
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title[:31])
+    # Column widths must be set before the first row in write-only mode
+    for column, width in zip('ABCD', (20, 10, 100, 8)):
+        ws.column_dimensions[column].width = width
+
+    styles = excel_styles()
+    header = []
+    for name in ("Timestamp", "Role", "Content", "Tokens"):
+        cell = WriteOnlyCell(ws, value=name)
+        cell.font = styles['key_font']
+        header.append(cell)
+    ws.append(header)
+
+    count = 0
+    for message in messages:
+        row = _row(message)
+        # Control characters (e.g. a pasted "\x1b") are not allowed in XLSX and would fail the whole export
+        ts, role, text = (ILLEGAL_CHARACTERS_RE.sub('', str(row[key])) for key in ("ts", "role", "content"))
+        content = WriteOnlyCell(ws, value=text[:XLSX_CELL_LIMIT])
+        content.data_type = 's'  # a reply starting with "=" is text, not a formula
+        content.alignment = styles['wrap']
+        ws.append([ts, role, content, row["tokens"]])
+        count += 1
+
+    wb.save(path)
+    return count
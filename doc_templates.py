@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Document Templates for ATLAS AI Telegram Bots
+Process-wide cache of PDF stylesheets, a pre-loaded DOCX template and shared openpyxl styles
+"""
+
+import copy
+import io
+from functools import lru_cache
+from typing import Dict
+
+@lru_cache(maxsize=1)
+def pdf_styles() -> Dict:
+    """Paragraph styles for the PDF pipeline, built once per process"""
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+
+    sample = getSampleStyleSheet()
+    body = ParagraphStyle('AtlasBody', parent=sample['Normal'], fontSize=10.5, leading=14, spaceAfter=6)
+    return {
+        'title': sample['Title'],
+        'meta': ParagraphStyle('AtlasMeta', parent=body, fontName='Helvetica-Oblique', textColor='#555555'),
+        'body': body,
+        'h1': ParagraphStyle('AtlasH1', parent=sample['Heading1'], spaceBefore=10),
+        'h2': ParagraphStyle('AtlasH2', parent=sample['Heading2'], spaceBefore=8),
+        'h3': ParagraphStyle('AtlasH3', parent=sample['Heading3'], spaceBefore=6),
+        'bullet': ParagraphStyle('AtlasBullet', parent=body, leftIndent=18, bulletIndent=6, spaceAfter=2),
+        'code': ParagraphStyle('AtlasCode', parent=sample['Code'], fontSize=8.5, leading=10.5,
+                               backColor='#f4f4f4', borderPadding=4, spaceBefore=4, spaceAfter=4)
+    }
+
+@lru_cache(maxsize=8)
+def pdf_bullet_style(indent: int):
+    """Nested list style, cached per indent level"""
+    from reportlab.lib.styles import ParagraphStyle
+
+    base = pdf_styles()['bullet']
+    return ParagraphStyle(f'AtlasBullet{indent}', parent=base, leftIndent=base.leftIndent + indent,
+                          bulletIndent=base.bulletIndent + indent)
+
+@lru_cache(maxsize=1)
+def _docx_template():
+    """python-docx's default template, parsed once and never modified"""
+    from docx import Document
+    return Document()
+
+@lru_cache(maxsize=1)
+def _docx_template_bytes() -> bytes:
+    buffer = io.BytesIO()
+    _docx_template().save(buffer)
+    return buffer.getvalue()
+
+def new_docx_document():
+    """A fresh Document cloned from the cached template (about 4x faster than Document())"""
+    try:
+        return copy.deepcopy(_docx_template())
+    except Exception as e:
+        print(f"⚠️ DOCX template clone failed, reloading from bytes: {e}")
+        from docx import Document
+        return Document(io.BytesIO(_docx_template_bytes()))
+
+@lru_cache(maxsize=1)
+def excel_styles() -> Dict:
+    """Shared openpyxl Font/Alignment objects (immutable, safe to reuse across workbooks)"""
+    from openpyxl.styles import Alignment, Font
+
+    return {
+        'title_font': Font(bold=True, size=16),
+        'title_alignment': Alignment(horizontal='center'),
+        'meta_font': Font(italic=True),
+        'key_font': Font(bold=True),
+        'wrap': Alignment(wrap_text=True, vertical='top')
+    }
+
+def clear_caches():
+    """Drop every cached style and template (used by bench_documents.py for cold timings)"""
+    for cached in (pdf_styles, pdf_bullet_style, _docx_template, _docx_template_bytes, excel_styles):
+        cached.cache_clear()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Document Job Pool for ATLAS AI Telegram Bot
+Runs CPU-bound document builds in worker processes with a bounded queue
+"""
+
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+class DocumentJobPool:
+    """Process pool for document generation so layout work never holds the bot's GIL"""
+
+    def __init__(self, workers: int = 2, max_pending: int = 16, timeout: float = 60, name: str = 'Document'):
+        self.name = name  # used in log lines and user-facing errors
+        self.workers = max(1, workers)
+        self.max_pending = max(self.workers, max_pending)
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.completed = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.rejected = 0
+        self.recycled = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Start worker processes on first use"""
+        with self._lock:
+            if self._executor is None:
+                # Forking a threaded process can copy held locks; start clean workers instead
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+            return self._executor
+
+    def _reset(self):
+        """Drop a broken pool so the next job starts fresh workers"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def _recycle(self, executor: ProcessPoolExecutor):
+        """Kill the workers of a pool running a hung job; its futures fail and free their slots"""
+        with self._lock:
+            if self._executor is not executor:
+                return  # another timeout already replaced it
+            self._executor = None
+            self.recycled += 1
+        print(f"♻️ Restarting {self.name.lower()} workers after a hung job")
+        # ProcessPoolExecutor cannot cancel a running job, so stop its processes directly
+        for process in list((executor._processes or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _count(self, name: str):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def _submit(self, func: Callable[..., Any], *args) -> Tuple[Optional[Future], Optional[ProcessPoolExecutor], Optional[str]]:
+        """Queue func(*args) if a slot is free; returns (future, its pool, user-facing error or None)"""
+        if not self._slots.acquire(blocking=False):
+            self._count('rejected')
+            return None, None, f"⏳ {self.name} builder is busy. Please try again in a moment."
+
+        try:
+            executor = self._get_executor()
+            future = executor.submit(func, *args)
+        except Exception as e:
+            self._slots.release()
+            self._reset()
+            self._count('failed')
+            print(f"❌ {self.name} job submit error: {e}")
+            return None, None, f"❌ {self.name} generation failed. Please try again."
+
+        # The slot frees when the job finishes, fails or is cancelled, even if we stop waiting on it
+        future.add_done_callback(lambda _: self._slots.release())
+        return future, executor, None
+
+    def _wait(self, future: Future, executor: ProcessPoolExecutor, deadline: float) -> Tuple[Any, Optional[str]]:
+        """Wait for a submitted job until the deadline; returns (result, user-facing error or None)"""
+        try:
+            result = future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except FutureTimeout:
+            self._count('timed_out')
+            # Still queued: just drop it. Running: it holds a worker, so replace the pool
+            if not future.cancel():
+                self._recycle(executor)
+            return None, f"⏱️ {self.name} generation timed out after {int(self.timeout)}s. Try a shorter {self.name.lower()}."
+        except BrokenProcessPool as e:
+            self._reset()
+            self._count('failed')
+            print(f"❌ {self.name} worker crashed: {e}")
+            return None, f"❌ {self.name} generation failed. Please try again."
+        except Exception as e:
+            self._count('failed')
+            print(f"❌ {self.name} job error: {e}")
+            return None, f"❌ {self.name} generation failed. Please try again."
+
+        self._count('completed')
+        return result, None
+
+    def run(self, func: Callable[..., Any], *args) -> Tuple[Any, Optional[str]]:
+        """Run func(*args) in a worker; returns (result, user-facing error or None)"""
+        future, executor, error = self._submit(func, *args)
+        if future is None:
+            return None, error
+        return self._wait(future, executor, time.monotonic() + self.timeout)
+
+    def run_many(self, jobs: List[Tuple[Callable[..., Any], Tuple]]) -> List[Tuple[Any, Optional[str]]]:
+        """Run several (func, args) jobs in parallel under one shared timeout; results keep job order"""
+        deadline = time.monotonic() + self.timeout
+        submitted = [self._submit(func, *args) for func, args in jobs]
+        return [self._wait(future, executor, deadline) if future is not None else (None, error)
+                for future, executor, error in submitted]
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get job statistics"""
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'completed': self.completed,
+                'failed': self.failed,
+                'timed_out': self.timed_out,
+                'rejected': self.rejected,
+                'recycled': self.recycled
+            }
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fake Groq for local load-balancing tests
+Serves an OpenAI-compatible chat completions endpoint with per-key rate limits and x-ratelimit-* headers
+
+Usage:
+    # Terminal 1 - fake Groq on :8090, 30 requests and 6000 tokens per key per minute
+    python fake_groq_server.py serve --port 8090 --rpm 30 --tpm 6000
+
+    # Terminal 2 - bot spreading load over three keys on the fake server
+    GROQ_API_URL=http://localhost:8090/openai/v1/chat/completions GroqAPIKey=k1 GROQ_API_KEYS=k2,k3 \\
+        python atlas_ai_telegram_bot.py
+
+    # Or drive GroqClient directly and report how requests spread over the keys
+    python fake_groq_server.py drive --url http://localhost:8090/openai/v1/chat/completions \\
+        --keys k1,k2,k3 --requests 120 --concurrency 8
+"""
+
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+from flask import Flask, Response, jsonify, request
+
+class _Window:
+    """Fixed one-minute request and token budget for one API key"""
+
+    def __init__(self, rpm: int, tpm: int, period: float):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.period = period
+        self.started = time.monotonic()
+        self.requests = 0
+        self.tokens = 0
+        self.served = 0
+        self.limited = 0
+
+    def headers(self) -> Dict[str, str]:
+        reset = max(0.0, self.period - (time.monotonic() - self.started))
+        return {
+            'x-ratelimit-limit-requests': str(self.rpm),
+            'x-ratelimit-limit-tokens': str(self.tpm),
+            'x-ratelimit-remaining-requests': str(max(0, self.rpm - self.requests)),
+            'x-ratelimit-remaining-tokens': str(max(0, self.tpm - self.tokens)),
+            'x-ratelimit-reset-requests': f"{reset:.2f}s",
+            'x-ratelimit-reset-tokens': f"{reset:.2f}s"
+        }
+
+    def admit(self, tokens: int) -> bool:
+        if time.monotonic() - self.started >= self.period:
+            self.started = time.monotonic()
+            self.requests = self.tokens = 0
+        if self.requests >= self.rpm or self.tokens + tokens > self.tpm:
+            self.limited += 1
+            return False
+        self.requests += 1
+        self.tokens += tokens
+        self.served += 1
+        return True
+
+def create_fake_groq(rpm: int, tpm: int, latency: float, period: float = 60.0) -> Flask:
+    """Chat completions stand-in that enforces per-key limits like Groq does"""
+    app = Flask(__name__)
+    windows: Dict[str, _Window] = {}
+    lock = threading.Lock()
+
+    @app.route('/openai/v1/chat/completions', methods=['POST'])
+    def chat_completions():
+        api_key = request.headers.get('Authorization', '').replace('Bearer ', '', 1)
+        payload = request.get_json(silent=True) or {}
+        prompt = " ".join(message.get('content', '') for message in payload.get('messages', []))
+        tokens = len(prompt) // 4 + int(payload.get('max_tokens') or 0)
+
+        with lock:
+            window = windows.setdefault(api_key, _Window(rpm, tpm, period))
+            admitted = window.admit(tokens)
+            headers = window.headers()
+
+        if not admitted:
+            headers['retry-after'] = str(max(1, int(float(headers['x-ratelimit-reset-tokens'][:-1]))))
+            body = {"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}}
+            return jsonify(body), 429, headers
+
+        time.sleep(latency)
+        reply = f"Fake reply to: {prompt[-60:]}"
+        if payload.get('stream'):
+            def events():
+                for word in reply.split(' '):
+                    chunk = {"choices": [{"index": 0, "delta": {"content": word + ' '}}]}
+                    yield f"data: {json.dumps(chunk)}\n\n"
+                yield "data: [DONE]\n\n"
+            return Response(events(), mimetype='text/event-stream', headers=headers)
+
+        return jsonify({
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "model": payload.get('model'),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": reply}, "finish_reason": "stop"}],
+            "usage": {"total_tokens": tokens}
+        }), 200, headers
+
+    @app.route('/keys')
+    def key_usage():
+        with lock:
+            return jsonify({key[-6:]: {'served': window.served, 'limited': window.limited}
+                            for key, window in windows.items()})
+
+    return app
+
+def drive(url: str, keys: str, requests_count: int, concurrency: int, max_retries: int = 3):
+    """Send chat completions through GroqClient and report how they spread over the keys"""
+    from groq_client import GroqClient
+    from groq_key_pool import GroqKeyPool
+    from http_transport import get_transport
+
+    pool = GroqKeyPool.from_env(None, keys, url)
+    client = GroqClient(get_transport(), None, max_retries=max_retries, max_delay=2, keys=pool)
+    payload = {"model": "llama-3.1-8b-instant", "max_tokens": 100,
+               "messages": [{"role": "user", "content": "Hello fake Groq"}]}
+
+    def one(_):
+        try:
+            return client.chat_completion(payload, timeout=10).status_code
+        except Exception as e:
+            return type(e).__name__
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(one, range(requests_count)))
+    elapsed = time.perf_counter() - started
+
+    ok = results.count(200)
+    stats = client.get_stats()
+    print(f"📨 {requests_count} requests in {elapsed:.1f}s: {ok} ok, {requests_count - ok} failed")
+    print(f"🔁 {stats['retries']} retries, {stats['failovers']} failovers to another key")
+    for label, key in stats['keys']['per_key'].items():
+        print(f"🔑 {label}: {key['requests']} sent, {key['throttled']} throttled, "
+              f"{key['remaining_requests']} requests / {key['remaining_tokens']} tokens left")
+    return ok == requests_count
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Groq for multi-key load-balancing tests")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    serve_cmd = commands.add_parser('serve', help="Run a fake Groq endpoint")
+    serve_cmd.add_argument('--port', type=int, default=8090)
+    serve_cmd.add_argument('--rpm', type=int, default=30, help="requests per minute per key")
+    serve_cmd.add_argument('--tpm', type=int, default=6000, help="tokens per minute per key")
+    serve_cmd.add_argument('--latency', type=float, default=0.05, help="seconds per completion")
+    serve_cmd.add_argument('--period', type=float, default=60.0, help="seconds per rate-limit window")
+
+    drive_cmd = commands.add_parser('drive', help="Load the endpoint through GroqClient")
+    drive_cmd.add_argument('--url', default='http://localhost:8090/openai/v1/chat/completions')
+    drive_cmd.add_argument('--keys', default='k1,k2,k3')
+    drive_cmd.add_argument('--requests', type=int, default=60)
+    drive_cmd.add_argument('--concurrency', type=int, default=4)
+
+    args = parser.parse_args()
+    if args.command == 'serve':
+        create_fake_groq(args.rpm, args.tpm, args.latency, args.period).run(
+            host='127.0.0.1', port=args.port, threaded=True)
+    else:
+        ok = drive(args.url, args.keys, args.requests, args.concurrency)
+        raise SystemExit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
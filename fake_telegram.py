@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fake Telegram for local webhook testing
+Serves a stand-in Bot API and POSTs synthetic updates to the bot's webhook
+
+Usage:
+    # Terminal 1 - fake Bot API on :8081
+    python fake_telegram.py serve --port 8081
+
+    # Terminal 2 - bot pointed at the fake API
+    TELEGRAM_API_URL=http://localhost:8081 BOT_MODE=webhook WEBHOOK_URL=http://localhost:8000 \\
+        python app_server.py
+
+    # Terminal 3 - drive 5 users x 10 messages through the webhook
+    python fake_telegram.py drive --webhook http://localhost:8000/telegram/webhook --users 5 --messages 10
+"""
+
+import argparse
+import itertools
+import json
+import threading
+import time
+import requests
+from flask import Flask, jsonify, request
+
+def create_fake_api() -> Flask:
+    """Bot API stand-in that records every method call"""
+    app = Flask(__name__)
+    calls = []
+    message_ids = itertools.count(1)
+    lock = threading.Lock()
+
+    @app.route('/bot<token>/<method>', methods=['GET', 'POST'])
+    def bot_method(token, method):
+        payload = request.get_json(silent=True) or request.form.to_dict() or request.args.to_dict()
+        with lock:
+            calls.append({'method': method, 'chat_id': payload.get('chat_id'), 'at': time.time()})
+
+        if method == 'getMe':
+            return jsonify({"ok": True, "result": {"id": 1, "is_bot": True, "username": "fake_atlas_bot"}})
+        if method == 'getUpdates':
+            return jsonify({"ok": True, "result": []})
+        if method == 'sendMediaGroup':
+            # Telegram answers an album with one message per item
+            try:
+                media = json.loads(payload.get('media') or '[]')
+            except ValueError:
+                media = []
+            return jsonify({"ok": True, "result": [
+                {"message_id": next(message_ids), "chat": {"id": payload.get('chat_id')},
+                 "document": {"file_id": f"fake-file-{index}-{time.time_ns()}"}}
+                for index, _ in enumerate(media)
+            ]})
+        message = {"message_id": next(message_ids), "chat": {"id": payload.get('chat_id')}}
+        if method in ('sendDocument', 'sendVoice'):
+            # Echo a file_id back (new for uploads, the same one for re-sends) so file_id caching is exercised
+            field = 'document' if method == 'sendDocument' else 'voice'
+            message[field] = {"file_id": payload.get(field) or f"fake-file-{time.time_ns()}"}
+        return jsonify({"ok": True, "result": message})
+
+    @app.route('/calls')
+    def list_calls():
+        with lock:
+            return jsonify(calls)
+
+    return app
+
+def drive(webhook: str, users: int, messages: int, secret: str = None, text: str = "Hello ATLAS"):
+    """POST users x messages updates and report webhook ack latency"""
+    headers = {'X-Telegram-Bot-Api-Secret-Token': secret} if secret else {}
+    session = requests.Session()
+    update_ids = itertools.count(int(time.time()))
+    latencies = []
+    failures = 0
+
+    for turn in range(messages):
+        for user in range(users):
+            user_id = 1000 + user
+            update = {
+                'update_id': next(update_ids),
+                'message': {
+                    'message_id': turn + 1,
+                    'from': {'id': user_id, 'first_name': f"User{user}", 'username': f"user{user}"},
+                    'chat': {'id': user_id, 'first_name': f"User{user}", 'type': 'private'},
+                    'date': int(time.time()),
+                    'text': f"{text} #{turn + 1}"
+                }
+            }
+            started = time.perf_counter()
+            response = session.post(webhook, json=update, headers=headers, timeout=10)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                failures += 1
+
+    latencies.sort()
+    print(f"📨 Sent {len(latencies)} updates, {failures} not acknowledged")
+    print(f"⚡ Ack latency: p50 {latencies[len(latencies) // 2] * 1000:.1f}ms, "
+          f"max {latencies[-1] * 1000:.1f}ms")
+    return failures == 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Telegram for webhook testing")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    serve_cmd = commands.add_parser('serve', help="Run a fake Bot API")
+    serve_cmd.add_argument('--port', type=int, default=8081)
+
+    drive_cmd = commands.add_parser('drive', help="POST synthetic updates to a webhook")
+    drive_cmd.add_argument('--webhook', default='http://localhost:8000/telegram/webhook')
+    drive_cmd.add_argument('--users', type=int, default=5)
+    drive_cmd.add_argument('--messages', type=int, default=10)
+    drive_cmd.add_argument('--secret')
+    drive_cmd.add_argument('--text', default="Hello ATLAS")
+
+    args = parser.parse_args()
+    if args.command == 'serve':
+        create_fake_api().run(host='127.0.0.1', port=args.port, threaded=True)
+    else:
+        ok = drive(args.webhook, args.users, args.messages, args.secret, args.text)
+        raise SystemExit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
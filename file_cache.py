@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+File ID Cache for ATLAS AI Telegram Bot
+Content-addressed Telegram file_ids so identical files are re-sent without rebuilding or uploading
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+class FileIdCache:
+    """LRU map of hash(user, format, title, content) -> Telegram file_id"""
+
+    def __init__(self, max_entries: int = 5000):
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidated = 0
+
+    @staticmethod
+    def key(user_id: int, kind: str, title: str, content: Any) -> str:
+        """Cache key for a user's generated file of the given format, title and content"""
+        # Per user: generated filenames carry the requester's id and timestamp
+        digest = hashlib.sha256()
+        for part in (str(user_id), kind, title, content if isinstance(content, str) else repr(content)):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached file_id, or None (counts a miss)"""
+        with self._lock:
+            file_id = self._entries.get(key)
+            if file_id is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return file_id
+
+    def put(self, key: str, file_id: str):
+        """Remember the file_id Telegram returned for an upload"""
+        with self._lock:
+            self._entries[key] = file_id
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def forget(self, key: str):
+        """Drop a file_id Telegram no longer accepts"""
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self.invalidated += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidated': self.invalidated
+            }
+
+def sent_file_id(message: Optional[Dict]) -> Optional[str]:
+    """Pull the file_id out of a sendDocument/sendVoice result message"""
+    # Telegram files non-OGG voice uploads as audio or document
+    for field in ('document', 'voice', 'audio'):
+        sent = (message or {}).get(field)
+        if isinstance(sent, dict) and sent.get('file_id'):
+            return sent['file_id']
+    return None
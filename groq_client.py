@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Groq Client for ATLAS AI Telegram Bots
+Chat completions with jittered backoff, Retry-After support, a circuit breaker and multi-key balancing
+"""
+
+import os
+import asyncio
+import random
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+import requests
+from context_builder import count_tokens
+from groq_key_pool import GroqKeyPool
+
+GROQ_CHAT_URL = "https://api.groq.com/openai/v1/chat/completions"
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+class CircuitOpenError(Exception):
+    """Raised when the circuit breaker is failing fast"""
+
+class CircuitBreaker:
+    """Closed -> open after repeated failures -> half-open probe after a cool-down"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """True if a request may go out now"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._probing = False
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True  # let exactly one probe through
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def release_probe(self):
+        """An attempt ended without a verdict (e.g. cancelled): let the next caller probe instead"""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.times_opened += 1
+                    print(f"🔌 Groq circuit breaker opened after {self.failures} failures")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self._probing = False
+
+class GroqClient:
+    """Resilient Groq chat completion client shared by sync and async runtimes"""
+
+    def __init__(self, http, api_key: str, max_retries: int = 3, base_delay: float = 0.5,
+                 max_delay: float = 20, breaker: Optional[CircuitBreaker] = None,
+                 keys: Optional[GroqKeyPool] = None):
+        self.http = http
+        self.api_key = api_key
+        self.keys = keys or GroqKeyPool([(api_key, GROQ_CHAT_URL)])
+        self.max_retries = max(0, max_retries)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = breaker or CircuitBreaker()
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+        self.rejected = 0
+        self.failovers = 0
+
+    def headers(self, api_key: Optional[str] = None) -> Dict[str, str]:
+        """Authorization headers for Groq API"""
+        return {
+            "Authorization": f"Bearer {api_key or self.api_key}",
+            "Content-Type": "application/json"
+        }
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Delay before the next attempt: Retry-After if given, else full-jitter exponential"""
+        if retry_after is not None:
+            return min(self.max_delay, retry_after + random.uniform(0, self.base_delay))
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def _count(self, name: str):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def _admit(self):
+        """Fail fast while the breaker is open"""
+        if not self.breaker.allow():
+            self._count('rejected')
+            raise CircuitOpenError("Groq circuit breaker is open")
+        self._count('requests')
+
+    def _abandon(self, key, error: BaseException):
+        """Release the key slot and settle the breaker after an unexpected error"""
+        if key is not None:
+            self.keys.release(key)
+        if isinstance(error, Exception):
+            self.breaker.record_failure()
+            self._count('failures')
+        else:
+            self.breaker.release_probe()  # cancelled or interrupted: no verdict on Groq's health
+
+    def _failover(self, status: int, key, tokens: int) -> bool:
+        """A 429 only means this key is spent; retry at once on another key if one has budget"""
+        if status != 429 or not self.keys.has_alternative(key, tokens):
+            return False
+        self._count('failovers')
+        self._count('retries')
+        return True
+
+    def chat_completion(self, payload: Dict, timeout: float = 60, stream: bool = False) -> requests.Response:
+        """POST a chat completion, retrying 429/5xx/network errors with backoff"""
+        self._admit()
+        tokens = estimate_tokens(payload)
+
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            key = self.keys.acquire(tokens)
+            try:
+                response = self.http.post(key.url, headers=self.headers(key.api_key), json=payload,
+                                          timeout=timeout, stream=stream)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                self.keys.release(key)
+                self.breaker.record_failure()
+                if attempt == self.max_retries or not self.breaker.allow():
+                    self._count('failures')
+                    raise
+            except BaseException as e:
+                # Anything else (ChunkedEncodingError, TooManyRedirects...) must still settle a half-open probe
+                self._abandon(key, e)
+                raise
+            else:
+                self.keys.release(key, response.status_code, response.headers)
+                if response.status_code not in RETRYABLE_STATUS:
+                    # Other 4xx are our request's fault, not a provider outage
+                    self.breaker.record_success()
+                    return response
+                if attempt < self.max_retries and self._failover(response.status_code, key, tokens):
+                    response.close()
+                    continue
+
+                self.breaker.record_failure()
+                if attempt == self.max_retries or not self.breaker.allow():
+                    self._count('failures')
+                    return response
+                retry_after = _retry_after_seconds(response.headers)
+                response.close()
+
+            self._count('retries')
+            time.sleep(self.backoff(attempt, retry_after))
+
+    async def chat_completion_async(self, runtime, payload: Dict, timeout: float = 60) -> Tuple[int, Any]:
+        """Async variant for the asyncio runtime; returns (status, body)"""
+        import aiohttp  # only present when the async runtime is in use
+
+        self._admit()
+        tokens = estimate_tokens(payload)
+
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            key = self.keys.acquire(tokens)
+            released = False
+            try:
+                async with runtime.session.post(key.url, headers=self.headers(key.api_key), json=payload,
+                                                timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                    status = response.status
+                    self.keys.release(key, status, response.headers)
+                    released = True
+                    if status not in RETRYABLE_STATUS:
+                        self.breaker.record_success()
+                        return status, await response.json(content_type=None)
+                    retry_after = _retry_after_seconds(response.headers)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if not released:
+                    self.keys.release(key)
+                self.breaker.record_failure()
+                if attempt == self.max_retries or not self.breaker.allow():
+                    self._count('failures')
+                    raise
+            except BaseException as e:
+                # ClientPayloadError, cancellation... must still settle a half-open probe
+                self._abandon(None if released else key, e)
+                raise
+            else:
+                if attempt < self.max_retries and self._failover(status, key, tokens):
+                    continue
+                self.breaker.record_failure()
+                if attempt == self.max_retries or not self.breaker.allow():
+                    self._count('failures')
+                    return status, None
+
+            self._count('retries')
+            await asyncio.sleep(self.backoff(attempt, retry_after))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get retry and circuit breaker metrics"""
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'retries': self.retries,
+                'failures': self.failures,
+                'rejected': self.rejected,
+                'failovers': self.failovers,
+                'breaker_state': self.breaker.state,
+                'breaker_opened': self.breaker.times_opened,
+                'keys': self.keys.get_stats()
+            }
+
+def create_groq_client(http, api_key: Optional[str]) -> GroqClient:
+    """Build the Groq client (key pool, retries, breaker) from environment settings"""
+    return GroqClient(
+        http,
+        api_key,
+        keys=GroqKeyPool.from_env(api_key, os.getenv('GROQ_API_KEYS'), os.getenv('GROQ_API_URL', GROQ_CHAT_URL)),
+        max_retries=int(os.getenv('GROQ_MAX_RETRIES', 3)),
+        max_delay=float(os.getenv('GROQ_MAX_BACKOFF', 20)),
+        breaker=CircuitBreaker(
+            failure_threshold=int(os.getenv('GROQ_BREAKER_THRESHOLD', 5)),
+            reset_timeout=float(os.getenv('GROQ_BREAKER_RESET', 30))
+        )
+    )
+
+def estimate_tokens(payload: Dict) -> int:
+    """Tokens a request counts against the per-minute budget: prompt estimate plus max_tokens"""
+    prompt = sum(count_tokens(message.get("content") or "") + 4 for message in payload.get("messages", []))
+    return prompt + int(payload.get("max_tokens") or 0)
+
+def _retry_after_seconds(headers) -> Optional[float]:
+    """Parse a Retry-After header given in seconds"""
+    value = headers.get('Retry-After') or headers.get('retry-after')
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
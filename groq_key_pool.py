@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Groq Key Pool for ATLAS AI Telegram Bots
+Spreads requests over several API keys/endpoints using Groq's x-ratelimit-* response headers
+"""
+
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+_DURATION_RE = re.compile(r'(\d+(?:\.\d+)?)(ms|h|m|s)')
+_UNITS = {'h': 3600.0, 'm': 60.0, 's': 1.0, 'ms': 0.001}
+
+def parse_reset(value: Optional[str]) -> Optional[float]:
+    """Seconds from a Groq reset header such as '7.66s', '2m59.56s' or '120ms'"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    parts = _DURATION_RE.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _UNITS[unit] for amount, unit in parts)
+
+def _header_int(headers, name: str) -> Optional[int]:
+    value = headers.get(name)
+    try:
+        return int(float(value)) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+class GroqKey:
+    """One API key (and endpoint) with the rate-limit budget it last reported"""
+
+    def __init__(self, api_key: str, url: str, label: str):
+        self.api_key = api_key
+        self.url = url
+        self.label = label
+        self.limit_requests: Optional[int] = None
+        self.limit_tokens: Optional[int] = None
+        self.remaining_requests: Optional[int] = None
+        self.remaining_tokens: Optional[int] = None
+        self.requests_reset_at = 0.0
+        self.tokens_reset_at = 0.0
+        self.cooldown_until = 0.0
+        self.in_flight = 0
+        self.requests = 0
+        self.throttled = 0
+
+    def refill(self, now: float):
+        """Assume a full budget once the advertised reset time has passed"""
+        if self.requests_reset_at and now >= self.requests_reset_at:
+            self.remaining_requests = self.limit_requests
+            self.requests_reset_at = 0.0
+        if self.tokens_reset_at and now >= self.tokens_reset_at:
+            self.remaining_tokens = self.limit_tokens
+            self.tokens_reset_at = 0.0
+
+    def exhausted(self, now: float, tokens: int) -> bool:
+        """True if this key would likely answer 429 right now"""
+        if now < self.cooldown_until:
+            return True
+        if self.remaining_requests is not None and self.remaining_requests <= 0:
+            return True
+        return self.remaining_tokens is not None and self.remaining_tokens < tokens
+
+    def headroom(self) -> float:
+        """Smallest remaining fraction of the request and token budgets (unknown counts as full)"""
+        fractions = [1.0]
+        if self.remaining_requests is not None and self.limit_requests:
+            fractions.append(self.remaining_requests / self.limit_requests)
+        if self.remaining_tokens is not None and self.limit_tokens:
+            fractions.append(self.remaining_tokens / self.limit_tokens)
+        return min(fractions)
+
+    def available_at(self) -> float:
+        """Earliest time this key is expected to accept requests again"""
+        waits = [self.cooldown_until]
+        if self.remaining_requests is not None and self.remaining_requests <= 0:
+            waits.append(self.requests_reset_at)
+        if self.remaining_tokens is not None and self.remaining_tokens <= 0:
+            waits.append(self.tokens_reset_at)
+        return max(waits)
+
+class GroqKeyPool:
+    """Pick the key with the most remaining budget and move off exhausted keys before they 429"""
+
+    def __init__(self, entries: List[Tuple[str, str]]):
+        if not entries:
+            raise ValueError("GroqKeyPool needs at least one API key")
+        self.keys = [GroqKey(api_key, url, f"key{index + 1}") for index, (api_key, url) in enumerate(entries)]
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, api_key: Optional[str], keys: Optional[str], default_url: str) -> "GroqKeyPool":
+        """Build from GroqAPIKey plus GROQ_API_KEYS ('key' or 'key@https://host/openai/v1/chat/completions', comma separated)"""
+        entries = []
+        for entry in (keys or '').split(','):
+            entry = entry.strip()
+            if not entry:
+                continue
+            key, _, url = entry.partition('@')
+            entries.append((key.strip(), url.strip() or default_url))
+        if api_key and all(key != api_key for key, _ in entries):
+            entries.insert(0, (api_key, default_url))
+        return cls(entries or [(api_key or '', default_url)])
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def acquire(self, tokens: int = 0) -> GroqKey:
+        """Reserve the key with the most headroom; when all are exhausted, the one that frees up first"""
+        now = time.monotonic()
+        with self._lock:
+            for key in self.keys:
+                key.refill(now)
+            ready = [key for key in self.keys if not key.exhausted(now, tokens)]
+            if ready:
+                chosen = max(ready, key=lambda key: (key.headroom(), -key.in_flight))
+            else:
+                chosen = min(self.keys, key=lambda key: (key.available_at(), key.in_flight))
+
+            # Spend the budget locally so concurrent callers spread out before the headers come back
+            chosen.in_flight += 1
+            chosen.requests += 1
+            if chosen.remaining_requests is not None:
+                chosen.remaining_requests -= 1
+            if chosen.remaining_tokens is not None:
+                chosen.remaining_tokens -= tokens
+            return chosen
+
+    def release(self, key: GroqKey, status: Optional[int] = None, headers=None):
+        """Return a key and record the budget its response reported"""
+        now = time.monotonic()
+        with self._lock:
+            key.in_flight = max(0, key.in_flight - 1)
+            if headers is None:
+                return
+            limit_requests = _header_int(headers, 'x-ratelimit-limit-requests')
+            limit_tokens = _header_int(headers, 'x-ratelimit-limit-tokens')
+            remaining_requests = _header_int(headers, 'x-ratelimit-remaining-requests')
+            remaining_tokens = _header_int(headers, 'x-ratelimit-remaining-tokens')
+            reset_requests = parse_reset(headers.get('x-ratelimit-reset-requests'))
+            reset_tokens = parse_reset(headers.get('x-ratelimit-reset-tokens'))
+
+            if limit_requests is not None:
+                key.limit_requests = limit_requests
+            if limit_tokens is not None:
+                key.limit_tokens = limit_tokens
+            if remaining_requests is not None:
+                key.remaining_requests = remaining_requests
+            if remaining_tokens is not None:
+                key.remaining_tokens = remaining_tokens
+            if reset_requests is not None:
+                key.requests_reset_at = now + reset_requests
+            if reset_tokens is not None:
+                key.tokens_reset_at = now + reset_tokens
+
+            if status == 429:
+                key.throttled += 1
+                retry_after = parse_reset(headers.get('retry-after'))
+                wait = retry_after if retry_after is not None else max(reset_tokens or 0, reset_requests or 0) or 1.0
+                key.cooldown_until = now + wait
+
+    def has_alternative(self, key: GroqKey, tokens: int = 0) -> bool:
+        """True if another key could take a request right now"""
+        now = time.monotonic()
+        with self._lock:
+            for other in self.keys:
+                if other is key:
+                    continue
+                other.refill(now)
+                if not other.exhausted(now, tokens):
+                    return True
+            return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get per-key budgets and usage"""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                'keys': len(self.keys),
+                'per_key': {
+                    key.label: {
+                        'requests': key.requests,
+                        'throttled': key.throttled,
+                        'in_flight': key.in_flight,
+                        'remaining_requests': key.remaining_requests,
+                        'remaining_tokens': key.remaining_tokens,
+                        'cooling_down': now < key.cooldown_until
+                    }
+                    for key in self.keys
+                }
+            }
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Groq Streaming for ATLAS AI Telegram Bot
+Parses server-sent completion chunks and edits the placeholder message as tokens arrive
+"""
+
+import json
+import time
+from typing import Iterator
+
+TELEGRAM_TEXT_LIMIT = 4000
+
+def iter_stream_deltas(response) -> Iterator[str]:
+    """Yield content deltas from a streaming chat completion response"""
+    for raw_line in response.iter_lines(chunk_size=None):
+        if not raw_line:
+            continue
+        line = raw_line.decode('utf-8') if isinstance(raw_line, bytes) else raw_line
+        if not line.startswith('data:'):
+            continue
+
+        data = line[5:].strip()
+        if data == '[DONE]':
+            break
+
+        try:
+            chunk = json.loads(data)
+        except ValueError:
+            continue
+
+        for choice in chunk.get('choices', []):
+            delta = choice.get('delta', {}).get('content')
+            if delta:
+                yield delta
+
+class StreamingEditor:
+    """Accumulate streamed text and edit one Telegram message at a throttled rate"""
+
+    def __init__(self, bot, chat_id: int, message_id: int, prefix: str = "",
+                 min_interval: float = 1.0, min_chars: int = 20):
+        self.bot = bot
+        self.chat_id = chat_id
+        self.message_id = message_id
+        self.prefix = prefix
+        self.min_interval = min_interval  # Telegram allows about one edit per second per chat
+        self.min_chars = min_chars
+        self.chunks = []
+        self.length = 0
+        self.shown_length = 0
+        self.last_edit = 0.0
+        self.edits = 0
+
+    def feed(self, delta: str):
+        """Add a token delta and edit the message if the throttle allows"""
+        self.chunks.append(delta)
+        self.length += len(delta)
+
+        # Only the first message's worth is shown live; the rest is sent as parts at the end
+        if self.shown_length >= TELEGRAM_TEXT_LIMIT:
+            return
+        if self.length - self.shown_length < self.min_chars and self.edits:
+            return
+        if time.monotonic() - self.last_edit < self.min_interval:
+            return
+        self._edit()
+
+    def _edit(self):
+        """Show the text so far with a typing cursor"""
+        text = self.text[:TELEGRAM_TEXT_LIMIT]
+        # Interim edits are plain text: half-streamed HTML may not parse yet
+        if self.bot.edit_message_text(self.chat_id, self.message_id, f"{self.prefix}{text} ▌", parse_mode=None):
+            self.edits += 1
+        self.shown_length = len(text)
+        self.last_edit = time.monotonic()
+
+    @property
+    def text(self) -> str:
+        """Full text received so far"""
+        if len(self.chunks) > 1:
+            self.chunks = [''.join(self.chunks)]
+        return self.chunks[0] if self.chunks else ''
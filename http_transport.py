@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTTP Transport for ATLAS AI Telegram Bot
+Shared keep-alive connection pools for api.telegram.org and api.groq.com
+"""
+
+import os
+import socket
+import threading
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+
+class KeepAliveAdapter(HTTPAdapter):
+    """HTTPAdapter with TCP keep-alive enabled on pooled sockets"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs['socket_options'] = HTTPConnection.default_socket_options + [
+            (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        ]
+        super().init_poolmanager(*args, **kwargs)
+
+class HttpTransport:
+    """One pooled requests.Session per host, shared by every caller"""
+
+    def __init__(self, pool_connections: int = 4, pool_maxsize: int = 32, keep_alive: bool = True):
+        self.pool_connections = max(1, pool_connections)
+        self.pool_maxsize = max(1, pool_maxsize)
+        self.keep_alive = keep_alive
+        self._sessions: Dict[str, requests.Session] = {}
+        self._lock = threading.Lock()
+
+    def session_for(self, url: str) -> requests.Session:
+        """Get (or create) the pooled session for a URL's host"""
+        host = urlsplit(url).netloc
+        session = self._sessions.get(host)
+        if session is None:
+            with self._lock:
+                session = self._sessions.get(host)
+                if session is None:
+                    session = requests.Session()
+                    adapter = KeepAliveAdapter(
+                        pool_connections=self.pool_connections,
+                        pool_maxsize=self.pool_maxsize,
+                        pool_block=False
+                    )
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    session.headers['Connection'] = 'keep-alive' if self.keep_alive else 'close'
+                    self._sessions[host] = session
+        return session
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """GET through the host's pooled session"""
+        return self.session_for(url).get(url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """POST through the host's pooled session"""
+        return self.session_for(url).post(url, **kwargs)
+
+    def post_file(self, url: str, data: Dict, field: str, file, timeout: float = 30) -> requests.Response:
+        """Multipart POST of a path or in-memory GeneratedFile; paths are reopened per call so retries resend them"""
+        if getattr(file, 'data', None) is not None:
+            return self.post(url, data=data, files={field: (file.name, file.data)}, timeout=timeout)
+        with open(getattr(file, 'path', file), 'rb') as handle:
+            return self.post(url, data=data, files={field: handle}, timeout=timeout)
+
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        """Requests, new connections and connection reuses per host"""
+        stats = {}
+        with self._lock:
+            sessions = list(self._sessions.items())
+
+        for host, session in sessions:
+            requests_made = 0
+            connections = 0
+            for adapter in set(session.adapters.values()):
+                pools = adapter.poolmanager.pools
+                for key in pools.keys():
+                    pool = pools.get(key)
+                    if pool is not None:
+                        requests_made += pool.num_requests
+                        connections += pool.num_connections
+            stats[host] = {
+                'requests': requests_made,
+                'connections': connections,
+                'reused': max(0, requests_made - connections)
+            }
+        return stats
+
+    def close(self):
+        """Close all pooled connections"""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions = {}
+
+_transport: Optional[HttpTransport] = None
+_transport_lock = threading.Lock()
+
+def get_transport() -> HttpTransport:
+    """Get the process-wide transport, configured from the environment"""
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = HttpTransport(
+                    pool_connections=int(os.getenv('HTTP_POOL_CONNECTIONS', 4)),
+                    pool_maxsize=int(os.getenv('HTTP_POOL_MAXSIZE', 32)),
+                    keep_alive=os.getenv('HTTP_KEEP_ALIVE', 'true').lower() != 'false'
+                )
+    return _transport
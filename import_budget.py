@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Import-time budget check for ATLAS AI Telegram Bot
+Measures cold-start import cost with `python -X importtime` and fails when it regresses
+
+Usage:
+    python import_budget.py                                  # atlas_ai_telegram_bot, 250 ms budget
+    python import_budget.py --module media_bot --budget-ms 400 --top 15
+
+Exits non-zero when the median import time is over budget or when a heavy media
+library (reportlab, python-docx, openpyxl, ...) is loaded at import time.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Set, Tuple
+
+# Only document/voice commands should ever load these
+HEAVY_MODULES = ('reportlab', 'docx', 'openpyxl', 'pyttsx3', 'pydub', 'PIL', 'markdown')
+
+def measure(module: str) -> Tuple[float, Dict[str, int], Set[str]]:
+    """Import `module` in a fresh interpreter; returns (its import ms, cumulative us per top-level import, every package loaded)"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr.strip().splitlines()[-1]}")
+
+    packages: Dict[str, int] = {}
+    loaded: Set[str] = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        root = name.strip().split('.')[0]
+        loaded.add(root)
+        if name.startswith('  '):
+            continue  # nested import, already counted in its parent's cumulative time
+        packages[root] = packages.get(root, 0) + int(cumulative)
+    # Only the module itself is billed; site, encodings and friends are interpreter startup
+    return packages.get(module.split('.')[0], 0) / 1000, packages, loaded
+
+def median_import(module: str, runs: int = 5) -> Tuple[float, List[float], Dict[str, int], Set[str]]:
+    """Warm up, then import `module` `runs` times; returns (median ms, every total, packages and loaded set of the median run)"""
+    measure(module)  # warm-up: compile .pyc files so they are not billed to the import
+    results = [measure(module) for _ in range(max(1, runs))]
+    totals = [total for total, _, _ in results]
+    median = statistics.median(totals)
+    _, packages, loaded = results[totals.index(min(totals, key=lambda total: abs(total - median)))]
+    return median, totals, packages, loaded
+
+def heavy_modules(loaded: Set[str]) -> List[str]:
+    """Heavy media libraries among the loaded top-level packages"""
+    return sorted(name for name in loaded if name in HEAVY_MODULES)
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the bot's import-time budget")
+    parser.add_argument('--module', default='atlas_ai_telegram_bot')
+    parser.add_argument('--budget-ms', type=float, default=float(os.getenv('IMPORT_BUDGET_MS', 250)))
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    try:
+        median, totals, packages, loaded = median_import(args.module, args.runs)
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        sys.exit(2)
+
+    print(f"⏱️ import {args.module}: median {median:.1f} ms over {len(totals)} runs "
+          f"(min {min(totals):.1f}, max {max(totals):.1f}), budget {args.budget_ms:.0f} ms")
+    for name, cumulative in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"   {cumulative / 1000:8.1f} ms  {name}")
+
+    failed = False
+    heavy = heavy_modules(loaded)
+    if heavy:
+        print(f"❌ Heavy media libraries loaded at import time: {', '.join(heavy)}")
+        failed = True
+    if median > args.budget_ms:
+        print(f"❌ Import time {median:.1f} ms is over the {args.budget_ms:.0f} ms budget")
+        failed = True
+    if failed:
+        sys.exit(1)
+    print("✅ Import time within budget")
+
+if __name__ == "__main__":
+    main()
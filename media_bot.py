@@ -8,10 +8,17 @@ Voice, Documents, Notes - No Multi-User Complexity
 import os
 import sys
 import time
-import requests
+import asyncio
 from datetime import datetime
+from typing import Dict, Optional, Tuple
 import tempfile
 import subprocess
+from update_dispatcher import UpdateDispatcher, poll_backoff
+from webhook import delete_webhook
+from http_transport import get_transport
+from send_scheduler import create_outbound_scheduler
+from groq_client import CircuitOpenError, create_groq_client
+from model_router import ModelRouter
 
 class MediaAtlasBot:
     """Media ATLAS AI Bot - Single User with Media Capabilities"""
@@ -22,41 +29,57 @@ class MediaAtlasBot:
         self.assistant_name = os.getenv('AssistantName', 'ATLAS')
         self.creator_name = os.getenv('Creator', 'K.V.SARVESH')
         self.last_update_id = 0
+        self.dispatcher = UpdateDispatcher(
+            workers=int(os.getenv('BOT_WORKERS', 8)),
+            queue_size=int(os.getenv('BOT_QUEUE_SIZE', 256))
+        )
+        self.runtime_mode = os.getenv('BOT_RUNTIME', 'sync').lower()  # 'sync' or 'async'
+        self.async_runtime = None  # Set while the asyncio runtime is running
+        self.http = get_transport()  # Shared keep-alive pools for Telegram and Groq
+        self.telegram_api = f"{os.getenv('TELEGRAM_API_URL', 'https://api.telegram.org')}/bot{self.bot_token}"
+        self.outbound = create_outbound_scheduler()
+        self.groq = create_groq_client(self.http, self.groq_api_key)
+        self.router = ModelRouter()
         
-        if not self.bot_token or not self.groq_api_key:
+        if not self.bot_token or not (self.groq_api_key or os.getenv('GROQ_API_KEYS')):
             print("❌ Missing required environment variables")
             sys.exit(1)
     
-    def send_message(self, chat_id: int, text: str) -> bool:
-        """Send message via Telegram API"""
+    def telegram_request(self, chat_id: int, method: str, **kwargs):
+        """Queue a Telegram API call on the rate-limited outbound scheduler"""
+        return self.outbound.submit(
+            chat_id,
+            lambda: self.http.post(f"{self.telegram_api}/{method}", timeout=30, **kwargs)
+        )
+    
+    def send_message(self, chat_id: int, text: str, wait: bool = True) -> bool:
+        """Send message via Telegram API (wait=False queues it and returns at once)"""
+        if self.async_runtime:
+            return self.async_runtime.call(self.async_runtime.send_message(chat_id, text))
         try:
-            response = requests.post(
-                f"https://api.telegram.org/bot{self.bot_token}/sendMessage",
+            future = self.telegram_request(
+                chat_id,
+                'sendMessage',
                 json={
                     'chat_id': chat_id,
                     'text': text,
                     'parse_mode': 'HTML'
-                },
-                timeout=30
+                }
             )
-            return response.status_code == 200
+            if not wait:
+                return True
+            return future.result().status_code == 200
         except:
             return False
     
     def send_voice_message(self, chat_id: int, voice_file_path: str) -> bool:
         """Send voice message via Telegram API"""
+        if self.async_runtime:
+            return self.async_runtime.call(self.async_runtime.send_voice_message(chat_id, voice_file_path))
+        def upload():
+            return self.http.post_file(f"{self.telegram_api}/sendVoice", {'chat_id': chat_id}, 'voice', voice_file_path)
         try:
-            with open(voice_file_path, 'rb') as voice_file:
-                response = requests.post(
-                    f"https://api.telegram.org/bot{self.bot_token}/sendVoice",
-                    data={
-                        'chat_id': chat_id
-                    },
-                    files={
-                        'voice': voice_file
-                    },
-                    timeout=30
-                )
+            response = self.outbound.submit(chat_id, upload).result()
             return response.status_code == 200
         except Exception as e:
             print(f"❌ Voice send error: {e}")
@@ -64,19 +87,13 @@ class MediaAtlasBot:
     
     def send_document(self, chat_id: int, document_path: str, caption: str = "") -> bool:
         """Send document via Telegram API"""
+        if self.async_runtime:
+            return self.async_runtime.call(self.async_runtime.send_document(chat_id, document_path, caption))
+        def upload():
+            return self.http.post_file(f"{self.telegram_api}/sendDocument",
+                                       {'chat_id': chat_id, 'caption': caption}, 'document', document_path)
         try:
-            with open(document_path, 'rb') as doc_file:
-                response = requests.post(
-                    f"https://api.telegram.org/bot{self.bot_token}/sendDocument",
-                    data={
-                        'chat_id': chat_id,
-                        'caption': caption
-                    },
-                    files={
-                        'document': doc_file
-                    },
-                    timeout=30
-                )
+            response = self.outbound.submit(chat_id, upload).result()
             return response.status_code == 200
         except Exception as e:
             print(f"❌ Document send error: {e}")
@@ -104,30 +121,15 @@ class MediaAtlasBot:
     def generate_pdf_document(self, title: str, content: str) -> str:
         """Generate PDF document"""
         try:
-            from reportlab.pdfgen import canvas
-            from reportlab.lib.pagesizes import letter
+            from pdf_pipeline import render_pdf
             
             # Create temporary file
             temp_file = tempfile.NamedTemporaryFile(suffix='.pdf', delete=False)
-            temp_file.close()
-            
-            # Create PDF
-            c = canvas.Canvas(temp_file.name, pagesize=letter)
-            c.setFont("Helvetica-Bold", 16)
-            c.drawString(50, 750, title)
-            c.setFont("Helvetica", 12)
             
-            # Add content (simple text wrapping)
-            y_position = 700
-            lines = content.split('\n')
-            for line in lines:
-                if y_position < 50:
-                    c.showPage()
-                    y_position = 750
-                c.drawString(50, y_position, line)
-                y_position -= 20
+            # Wrapped, escaped paragraphs instead of raw drawString lines
+            temp_file.write(render_pdf(title, content))
+            temp_file.close()
             
-            c.save()
             return temp_file.name
         except Exception as e:
             print(f"❌ PDF error: {e}")
@@ -136,14 +138,14 @@ class MediaAtlasBot:
     def generate_word_document(self, title: str, content: str) -> str:
         """Generate Word document"""
         try:
-            from docx import Document
+            from doc_templates import new_docx_document
             
             # Create temporary file
             temp_file = tempfile.NamedTemporaryFile(suffix='.docx', delete=False)
             temp_file.close()
             
-            # Create Word document
-            doc = Document()
+            # Clone the pre-loaded template instead of re-parsing it
+            doc = new_docx_document()
             doc.add_heading(title, 0)
             doc.add_paragraph(content)
             doc.save(temp_file.name)
@@ -181,46 +183,72 @@ class MediaAtlasBot:
             print(f"❌ Excel error: {e}")
             return None
     
+    def build_groq_request(self, prompt: str) -> Dict:
+        """Build the Groq chat completion payload for a prompt"""
+        route = self.router.route(prompt)
+        return {
+            'model': route['model'],
+            'messages': [
+                {
+                    'role': 'system',
+                    'content': f"""You are {self.assistant_name}, an advanced AI assistant created by {self.creator_name}. 
+You provide intelligent, helpful, and accurate responses to user questions."""
+                },
+                {
+                    'role': 'user',
+                    'content': prompt
+                }
+            ],
+            'max_tokens': min(route['max_tokens'], 1000),
+            'temperature': 0.7
+        }
+    
     def call_groq_ai(self, prompt: str) -> str:
         """Get AI response from Groq"""
         try:
-            headers = {
-                'Authorization': f'Bearer {self.groq_api_key}',
-                'Content-Type': 'application/json'
-            }
-            
-            data = {
-                'model': 'llama3-70b-8192',
-                'messages': [
-                    {
-                        'role': 'system',
-                        'content': f"""You are {self.assistant_name}, an advanced AI assistant created by {self.creator_name}. 
-You provide intelligent, helpful, and accurate responses to user questions."""
-                    },
-                    {
-                        'role': 'user',
-                        'content': prompt
-                    }
-                ],
-                'max_tokens': 1000,
-                'temperature': 0.7
-            }
-            
-            response = requests.post(
-                'https://api.groq.com/openai/v1/chat/completions',
-                headers=headers,
-                json=data,
-                timeout=30
-            )
+            payload = self.build_groq_request(prompt)
+            started = time.monotonic()
+            response = self.groq.chat_completion(payload, timeout=30)
+            self.router.record(payload['model'], time.monotonic() - started, response.status_code == 200)
             
             if response.status_code == 200:
                 return response.json()['choices'][0]['message']['content']
             else:
                 return "❌ AI service temporarily unavailable"
                 
+        except CircuitOpenError:
+            return "⚠️ AI service is recovering from an outage. Please try again in a minute."
         except Exception as e:
             return f"❌ Error: {str(e)}"
     
+    async def call_groq_ai_async(self, runtime, prompt: str) -> str:
+        """Get AI response from Groq on the asyncio runtime"""
+        try:
+            payload = self.build_groq_request(prompt)
+            started = time.monotonic()
+            status, result = await self.groq.chat_completion_async(runtime, payload, timeout=30)
+            self.router.record(payload['model'], time.monotonic() - started, status == 200)
+            
+            if status == 200:
+                return result['choices'][0]['message']['content']
+            else:
+                return "❌ AI service temporarily unavailable"
+                
+        except CircuitOpenError:
+            return "⚠️ AI service is recovering from an outage. Please try again in a minute."
+        except Exception as e:
+            return f"❌ Error: {str(e)}"
+    
+    def parse_update(self, update: Dict) -> Optional[Tuple[int, Tuple]]:
+        """Extract (ordering key, process_message args) from a Telegram update"""
+        message = update.get('message')
+        if not message or 'text' not in message:
+            return None
+        
+        chat_id = message['chat']['id']
+        user_name = message['chat'].get('first_name', 'User')
+        return chat_id, (chat_id, user_name, message['text'])
+    
     def process_message(self, chat_id: int, user_name: str, text: str):
         """Process incoming message"""
         print(f"📩 {user_name}: {text}")
@@ -387,6 +415,18 @@ Ask me anything - I have complete intelligence and media capabilities for you!""
             ai_response = self.call_groq_ai(text)
             self.send_message(chat_id, ai_response)
     
+    async def process_message_async(self, runtime, chat_id: int, user_name: str, text: str):
+        """Process incoming message on the asyncio runtime"""
+        # Commands build files or audio, so they keep the sync handlers on a thread
+        if text.startswith('/'):
+            await runtime.run_sync(self.process_message, chat_id, user_name, text)
+            return
+        
+        print(f"📩 {user_name}: {text}")
+        await runtime.send_message(chat_id, f"🤔 {self.assistant_name} is thinking...")
+        ai_response = await self.call_groq_ai_async(runtime, text)
+        await runtime.send_message(chat_id, ai_response)
+    
     def run(self):
         """Run the bot"""
         print(f"🚀 Starting {self.assistant_name} AI Telegram Bot - Media Edition...")
@@ -394,34 +434,64 @@ Ask me anything - I have complete intelligence and media capabilities for you!""
         print(f"🎵 Media Capabilities: Voice, PDF, Word, Excel")
         print(f"🤖 Bot ready to receive messages!")
         
+        # Polling only works once no webhook is registered
+        delete_webhook(self)
+        
+        if self.runtime_mode == 'async':
+            self.run_async()
+            return
+        
+        # Updates run on the worker pool so a slow chat never blocks polling
+        self.dispatcher.start()
+        
+        failures = 0
         while True:
             try:
-                response = requests.get(
-                    f"https://api.telegram.org/bot{self.bot_token}/getUpdates",
+                response = self.http.get(
+                    f"{self.telegram_api}/getUpdates",
                     params={'offset': self.last_update_id + 1, 'timeout': 30},
                     timeout=35
                 )
                 
-                if response.status_code == 200:
-                    data = response.json()
-                    if data.get('result'):
-                        for update in data['result']:
-                            self.last_update_id = update['update_id']
-                            message = update.get('message')
-                            if message and 'text' in message:
-                                chat_id = message['chat']['id']
-                                user_name = message['chat'].get('first_name', 'User')
-                                text = message['text']
-                                self.process_message(chat_id, user_name, text)
+                if response.status_code != 200:
+                    # 401/409/5xx come back at once; don't hammer Telegram
+                    failures += 1
+                    delay = poll_backoff(failures)
+                    print(f"❌ getUpdates failed: {response.status_code}, retrying in {delay:.0f}s")
+                    time.sleep(delay)
+                    continue
+                failures = 0
                 
-                time.sleep(1)
+                data = response.json()
+                if data.get('result'):
+                    for update in data['result']:
+                        self.last_update_id = update['update_id']
+                        parsed = self.parse_update(update)
+                        if parsed:
+                            chat_id, args = parsed
+                            self.dispatcher.submit(chat_id, self.process_message, *args)
                 
             except KeyboardInterrupt:
                 print("\n👋 Bot stopped by user")
+                self.dispatcher.stop(wait=False)
                 break
             except Exception as e:
                 print(f"❌ Error: {e}")
                 time.sleep(5)
+    
+    def run_async(self):
+        """Run polling, Groq calls and Telegram sends on an asyncio event loop"""
+        from async_runtime import AsyncBotRuntime  # aiohttp is only needed in async mode
+        
+        runtime = AsyncBotRuntime(
+            self,
+            max_in_flight=int(os.getenv('ASYNC_MAX_IN_FLIGHT', 500)),
+            executor_workers=int(os.getenv('BOT_WORKERS', 8))
+        )
+        try:
+            asyncio.run(runtime.run())
+        except KeyboardInterrupt:
+            print("\n👋 Bot stopped by user")
 
 if __name__ == "__main__":
     bot = MediaAtlasBot()
@@ -8,21 +8,55 @@ Handles voice messages, notes, and file generation
 import os
 import io
 import tempfile
-import base64
 from datetime import datetime
-from typing import Optional, Dict, Any
-import requests
-from PIL import Image
-import markdown
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
-from docx import Document
-import openpyxl
-from openpyxl.styles import Font, Alignment
-import pyttsx3
+from typing import Optional, Dict, Any, List, Union
+
+# reportlab, python-docx, openpyxl and pyttsx3 are imported inside the generators that
+# use them, so chat-only processes never pay for loading them (see import_budget.py)
+
+# Report format -> MediaHandler generator, in default order
+REPORT_FORMATS = {
+    'markdown': 'generate_markdown_note',
+    'pdf': 'generate_pdf_document',
+    'word': 'generate_word_document'
+}
+REPORT_FORMAT_ALIASES = {'md': 'markdown', 'note': 'markdown', 'docx': 'word', 'doc': 'word'}
+
+def parse_report_formats(text: str) -> Optional[List[str]]:
+    """Formats from e.g. "pdf, word" (all when empty); None if any name is unknown"""
+    names = [name.strip().lower() for name in text.replace(' ', ',').split(',') if name.strip()]
+    if not names:
+        return list(REPORT_FORMATS)
+    formats = []
+    for name in names:
+        name = REPORT_FORMAT_ALIASES.get(name, name)
+        if name not in REPORT_FORMATS:
+            return None
+        if name not in formats:
+            formats.append(name)
+    return formats
+
+class GeneratedFile:
+    """A generated file held in memory, or spilled to disk when it is large"""
+    
+    def __init__(self, name: str, data: Optional[bytes] = None, path: Optional[str] = None):
+        self.name = name
+        self.data = data
+        self.path = path
+    
+    @property
+    def size(self) -> int:
+        """File size in bytes"""
+        if self.data is not None:
+            return len(self.data)
+        return os.path.getsize(self.path)
+    
+    def read(self) -> bytes:
+        """File contents as bytes"""
+        if self.data is not None:
+            return self.data
+        with open(self.path, 'rb') as f:
+            return f.read()
 
 class MediaHandler:
     """Handle voice, notes, and file generation for ATLAS AI Bot"""
@@ -30,32 +64,35 @@ class MediaHandler:
     def __init__(self):
         self.temp_dir = tempfile.mkdtemp()
         self.voice_engine = None
+        # Generated files stay in memory unless larger than this many bytes
+        self.spool_threshold = int(os.getenv('MEDIA_SPOOL_THRESHOLD', 5 * 1024 * 1024))
+    
+    def _finish_file(self, name: str, data: bytes) -> GeneratedFile:
+        """Keep small files in memory; write large ones to temp_dir"""
+        if len(data) <= self.spool_threshold:
+            return GeneratedFile(name, data=data)
+        
+        path = os.path.join(self.temp_dir, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return GeneratedFile(name, path=path)
         
-    def text_to_speech(self, text: str, user_id: int) -> Optional[str]:
-        """Convert text to speech and return audio file path"""
+    def text_to_speech(self, text: str, user_id: int) -> Optional[GeneratedFile]:
+        """Convert text to speech and return an OGG/Opus voice file"""
         try:
-            # Create temporary audio file
-            audio_file = os.path.join(self.temp_dir, f"voice_{user_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.mp3")
+            from tts_pool import synthesize_speech  # reuses this process's engine across calls
             
-            # Use pyttsx3 for text-to-speech
-            engine = pyttsx3.init()
-            engine.setProperty('rate', 150)  # Speech rate
-            engine.setProperty('volume', 0.9)  # Volume level
-            
-            # Save to file
-            engine.save_to_file(text, audio_file)
-            engine.runAndWait()
-            
-            return audio_file
+            data, extension = synthesize_speech(text)
+            return self._finish_file(f"voice_{user_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}", data)
             
         except Exception as e:
             print(f"❌ Text-to-speech error: {e}")
             return None
     
-    def generate_markdown_note(self, title: str, content: str, user_id: int) -> str:
+    def generate_markdown_note(self, title: str, content: str, user_id: int) -> Optional[GeneratedFile]:
         """Generate markdown note file"""
         try:
-            note_file = os.path.join(self.temp_dir, f"note_{user_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.md")
+            note_name = f"note_{user_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.md"
             
             markdown_content = f"""# {title}
 
@@ -70,61 +107,37 @@ class MediaHandler:
 *This note was generated by ATLAS AI Telegram Bot*
 """
             
-            with open(note_file, 'w', encoding='utf-8') as f:
-                f.write(markdown_content)
-            
-            return note_file
+            return self._finish_file(note_name, markdown_content.encode('utf-8'))
             
         except Exception as e:
             print(f"❌ Markdown generation error: {e}")
             return None
     
-    def generate_pdf_document(self, title: str, content: str, user_id: int) -> str:
+    def generate_pdf_document(self, title: str, content: str, user_id: int) -> Optional[GeneratedFile]:
         """Generate PDF document"""
         try:
-            pdf_file = os.path.join(self.temp_dir, f"doc_{user_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf")
+            from pdf_pipeline import render_pdf
             
-            # Create PDF
-            doc = SimpleDocTemplate(pdf_file, pagesize=letter)
-            styles = getSampleStyleSheet()
-            story = []
+            pdf_name = f"doc_{user_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
             
-            # Title
-            title_style = styles['Title']
-            title = Paragraph(title, title_style)
-            story.append(title)
-            story.append(Spacer(1, 12))
-            
-            # Metadata
-            meta_style = styles['Normal']
-            meta_text = f"<i>Generated by ATLAS AI on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</i>"
-            meta = Paragraph(meta_text, meta_style)
-            story.append(meta)
-            story.append(Spacer(1, 12))
-            
-            # Content
-            content_style = styles['Normal']
-            # Convert markdown to basic HTML for PDF
-            content_html = content.replace('\n', '<br/>')
-            content_para = Paragraph(content_html, content_style)
-            story.append(content_para)
-            
-            # Build PDF
-            doc.build(story)
+            # Markdown headings, lists and code become their own small flowables
+            data = render_pdf(title, content, f"Generated by ATLAS AI on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
             
-            return pdf_file
+            return self._finish_file(pdf_name, data)
             
         except Exception as e:
             print(f"❌ PDF generation error: {e}")
             return None
     
-    def generate_word_document(self, title: str, content: str, user_id: int) -> str:
+    def generate_word_document(self, title: str, content: str, user_id: int) -> Optional[GeneratedFile]:
         """Generate Word document"""
         try:
-            doc_file = os.path.join(self.temp_dir, f"doc_{user_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.docx")
+            from doc_templates import new_docx_document
             
-            # Create Word document
-            doc = Document()
+            doc_name = f"doc_{user_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.docx"
+            
+            # Clone the pre-loaded template instead of re-parsing it
+            doc = new_docx_document()
             
             # Title
             title_para = doc.add_heading(title, 0)
@@ -144,18 +157,23 @@ class MediaHandler:
             footer_para.alignment = 1  # Center
             
             # Save document
-            doc.save(doc_file)
+            buffer = io.BytesIO()
+            doc.save(buffer)
             
-            return doc_file
+            return self._finish_file(doc_name, buffer.getvalue())
             
         except Exception as e:
             print(f"❌ Word document generation error: {e}")
             return None
     
-    def generate_excel_sheet(self, title: str, data: Dict[str, Any], user_id: int) -> str:
+    def generate_excel_sheet(self, title: str, data: Dict[str, Any], user_id: int) -> Optional[GeneratedFile]:
         """Generate Excel spreadsheet"""
         try:
-            excel_file = os.path.join(self.temp_dir, f"sheet_{user_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx")
+            import openpyxl
+            from doc_templates import excel_styles
+            
+            styles = excel_styles()
+            excel_name = f"sheet_{user_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
             
             # Create Excel workbook
             wb = openpyxl.Workbook()
@@ -164,20 +182,20 @@ class MediaHandler:
             
             # Title cell
             ws['A1'] = title
-            ws['A1'].font = Font(bold=True, size=16)
-            ws['A1'].alignment = Alignment(horizontal='center')
+            ws['A1'].font = styles['title_font']
+            ws['A1'].alignment = styles['title_alignment']
             ws.merge_cells('A1:B1')
             
             # Metadata
             ws['A2'] = f"Generated by ATLAS AI on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-            ws['A2'].font = Font(italic=True)
+            ws['A2'].font = styles['meta_font']
             ws.merge_cells('A2:B2')
             
             # Data
             row = 4
             for key, value in data.items():
                 ws[f'A{row}'] = key
-                ws[f'A{row}'].font = Font(bold=True)
+                ws[f'A{row}'].font = styles['key_font']
                 ws[f'B{row}'] = str(value)
                 row += 1
             
@@ -186,35 +204,31 @@ class MediaHandler:
             ws.column_dimensions['B'].width = 50
             
             # Save workbook
-            wb.save(excel_file)
+            buffer = io.BytesIO()
+            wb.save(buffer)
             
-            return excel_file
+            return self._finish_file(excel_name, buffer.getvalue())
             
         except Exception as e:
             print(f"❌ Excel generation error: {e}")
             return None
     
-    def generate_summary_report(self, content: str, user_id: int) -> Dict[str, str]:
+    def generate_report_file(self, report_format: str, title: str, content: str, user_id: int) -> Optional[GeneratedFile]:
+        """Generate one format of a report"""
+        generator = getattr(self, REPORT_FORMATS[report_format])
+        return generator(title, content, user_id)
+    
+    def generate_summary_report(self, content: str, user_id: int, title: Optional[str] = None,
+                                formats: Optional[List[str]] = None) -> Dict[str, GeneratedFile]:
         """Generate multiple format summary report"""
         files = {}
         
-        # Generate different formats
-        title = f"ATLAS AI Report - {datetime.now().strftime('%Y-%m-%d')}"
+        title = title or f"ATLAS AI Report - {datetime.now().strftime('%Y-%m-%d')}"
         
-        # Markdown
-        md_file = self.generate_markdown_note(title, content, user_id)
-        if md_file:
-            files['markdown'] = md_file
-        
-        # PDF
-        pdf_file = self.generate_pdf_document(title, content, user_id)
-        if pdf_file:
-            files['pdf'] = pdf_file
-        
-        # Word
-        word_file = self.generate_word_document(title, content, user_id)
-        if word_file:
-            files['word'] = word_file
+        for report_format in formats or list(REPORT_FORMATS):
+            report_file = self.generate_report_file(report_format, title, content, user_id)
+            if report_file:
+                files[report_format] = report_file
         
         return files
     
@@ -228,9 +242,19 @@ class MediaHandler:
         except Exception as e:
             print(f"❌ Cleanup error: {e}")
     
-    def get_file_info(self, file_path: str) -> Dict[str, Any]:
+    def get_file_info(self, file_path: Union[str, GeneratedFile]) -> Dict[str, Any]:
         """Get file information"""
         try:
+            if isinstance(file_path, GeneratedFile):
+                if file_path.path is None:
+                    return {
+                        'name': file_path.name,
+                        'size': file_path.size,
+                        'type': os.path.splitext(file_path.name)[1],
+                        'created': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                    }
+                file_path = file_path.path
+            
             if not os.path.exists(file_path):
                 return {}
             
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Memory Compactor for ATLAS AI Telegram Bot
+Folds turns leaving the prompt window into a running per-session summary, off the reply path
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set
+
+SUMMARY_INSTRUCTIONS = """You maintain the long-term memory of a chat between a user and an AI assistant.
+Merge the new turns into the existing summary. Keep facts about the user (name, goals, preferences),
+decisions, open questions and anything the assistant promised. Drop greetings and filler.
+Reply with the updated summary only, as short bullet points."""
+MAX_TURN_CHARS = 1500  # long answers are clipped before summarizing; the gist is enough
+
+def build_summary_request(summary: str, turns: List[Dict], model: str, max_tokens: int) -> Dict:
+    """Groq payload that folds turns into the existing summary"""
+    transcript = "\n\n".join(
+        f"{turn['role']}: {turn['content'][:MAX_TURN_CHARS]}" for turn in turns
+    )
+    return {
+        "model": model,
+        "messages": [
+            {"role": "system", "content": SUMMARY_INSTRUCTIONS},
+            {"role": "user", "content": f"Existing summary:\n{summary or '(empty)'}\n\nNew turns:\n{transcript}"}
+        ],
+        "max_tokens": max_tokens,
+        "temperature": 0.2
+    }
+
+class MemoryCompactor:
+    """Summarize each session's oldest turns in the background once they fall out of the window"""
+
+    def __init__(self, store, summarize: Callable[[str, List[Dict]], Optional[str]],
+                 window: int = 8, batch: int = 4, workers: int = 1):
+        self.store = store
+        self.summarize = summarize
+        self.window = max(0, window)
+        self.batch = max(2, batch)  # fold whole exchanges, a few at a time
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="atlas-compactor")
+        self._pending: Set[Hashable] = set()
+        self._lock = threading.Lock()
+        self.compactions = 0
+        self.folded_turns = 0
+        self.failures = 0
+        self.stale = 0
+
+    def maybe_compact(self, user_id: Hashable, session: Dict) -> bool:
+        """Schedule a compaction if enough turns have left the window; never blocks"""
+        if len(session["messages"]) < self.window + self.batch:
+            return False
+        with self._lock:
+            if user_id in self._pending:
+                return False
+            self._pending.add(user_id)
+        try:
+            self.executor.submit(self._compact, user_id, session)
+        except RuntimeError:  # shut down
+            with self._lock:
+                self._pending.discard(user_id)
+            return False
+        return True
+
+    def _compact(self, user_id: Hashable, session: Dict):
+        try:
+            messages = session["messages"]
+            folded = messages[:len(messages) - self.window]
+            if not folded:
+                return
+            summary = self.summarize(session.get("summary", ""), folded)
+            if not summary:
+                with self._lock:
+                    self.failures += 1
+                return
+
+            # Cleared, evicted or trimmed while we were summarizing: the result no longer applies
+            if (self.store.get(user_id) is not session or session["messages"] is not messages
+                    or len(messages) < len(folded)
+                    or any(current is not old for current, old in zip(messages, folded))):
+                with self._lock:
+                    self.stale += 1
+                return
+
+            del messages[:len(folded)]
+            session["summary"] = summary
+            session["summarized_turns"] = session.get("summarized_turns", 0) + len(folded)
+            self.store.mark_dirty(user_id, session)
+            with self._lock:
+                self.compactions += 1
+                self.folded_turns += len(folded)
+            print(f"🗜️ Folded {len(folded)} turns into the summary for {session.get('name') or user_id}")
+        except Exception as e:
+            with self._lock:
+                self.failures += 1
+            print(f"❌ Memory compaction error: {e}")
+        finally:
+            with self._lock:
+                self._pending.discard(user_id)
+
+    def close(self):
+        """Stop accepting work; running summaries are abandoned"""
+        self.executor.shutdown(wait=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get compaction statistics"""
+        with self._lock:
+            return {
+                'compactions': self.compactions,
+                'folded_turns': self.folded_turns,
+                'failures': self.failures,
+                'stale': self.stale,
+                'pending': len(self._pending)
+            }
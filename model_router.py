@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Model Router for ATLAS AI Telegram Bots
+Sends trivial turns to a fast small model and complex ones to the 70B model
+"""
+
+import json
+import os
+import re
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+DEFAULT_ROUTES = {
+    "tiers": {
+        "fast": {"model": "llama-3.1-8b-instant", "max_tokens": 1024},
+        "full": {"model": "llama-3.3-70b-versatile", "max_tokens": 3000}
+    },
+    "fast_max_chars": 80,     # longer messages always go to the full model
+    "fast_max_history": 12,   # deep conversations keep the full model for context
+    "fast_styles": ["concise", "brief", "short"],  # response_style values that accept the fast model
+    "max_error_rate": 0.5,    # a tier failing this often is skipped while the other is healthy
+    "probe_every": 20         # one in N requests still tries a skipped tier so its stats can recover
+}
+
+SMALL_TALK_RE = re.compile(
+    r"^(hi+|hey+|hello+|yo|sup|hola|namaste|good (morning|afternoon|evening|night)|"
+    r"thanks?( you)?( so much)?|thank u|thx|ty|ok(ay)?|cool|nice|great|awesome|got it|"
+    r"bye|goodbye|see (you|ya)|gn|lol|haha+|yes|yeah|yep|no|nope|sure|"
+    r"how are you|who are you|what('?s| is) your name)[\s!.?\u2600-\u27bf\ufe0f\U0001f300-\U0001faff]*$",
+    re.IGNORECASE
+)
+CONTINUATION_RE = re.compile(
+    r"^(continue|go on|keep going|carry on|more|tell me more|and( then| so)?|then what|what else|why( not)?|"
+    r"how so|really|elaborate|expand( on (it|that))?|next|do it|fix it|try again|again|what about (it|that))"
+    r"[\s!.?\u2026]*$",
+    re.IGNORECASE
+)
+COMPLEX_RE = re.compile(
+    r"```|\b(explain|why|how (do|does|can|to|would)|compare|difference|analy[sz]e|design|implement|"
+    r"code|program|debug|error|function|algorithm|prove|derive|calculate|solve|step[- ]by[- ]step|"
+    r"essay|article|story|plan|strategy|summari[sz]e|translate|write)\b",
+    re.IGNORECASE
+)
+
+def load_routes(value: Optional[str]) -> Dict:
+    """Routing table from MODEL_ROUTES: inline JSON or a path to a JSON file, merged over the defaults"""
+    routes = json.loads(json.dumps(DEFAULT_ROUTES))
+    if not value:
+        return routes
+    try:
+        if value.strip().startswith('{'):
+            overrides = json.loads(value)
+        else:
+            with open(value, encoding='utf-8') as f:
+                overrides = json.load(f)
+    except Exception as e:
+        print(f"❌ Invalid MODEL_ROUTES, using defaults: {e}")
+        return routes
+    for name, tier in overrides.pop("tiers", {}).items():
+        routes["tiers"].setdefault(name, {}).update(tier)
+    routes.update(overrides)
+    return routes
+
+class ModelRouter:
+    """Classify requests by cheap local features and track per-model latency (EWMA)"""
+
+    def __init__(self, routes: Optional[Dict] = None, alpha: float = 0.2):
+        self.routes = routes or load_routes(os.getenv('MODEL_ROUTES'))
+        self.alpha = alpha
+        self._lock = threading.Lock()
+        self._models: Dict[str, Dict[str, float]] = {}
+        self.routed: Dict[str, int] = {}
+        self.skipped = 0
+
+    def classify(self, message: str, history_size: int = 0, response_style: Optional[str] = None,
+                 previous_tier: Optional[str] = None) -> Tuple[str, str]:
+        """(tier, reason) from message length, question type, history size, style and the previous turn's tier"""
+        text = message.strip()
+        if len(text) > self.routes["fast_max_chars"] or COMPLEX_RE.search(text):
+            return "full", "complex"
+        if history_size > self.routes["fast_max_history"]:
+            return "full", "long-context"
+        if SMALL_TALK_RE.match(text):
+            return "fast", "small-talk"
+        # "continue", "and then?", "fix it" mid-thread extend the previous answer, so they keep its model
+        if history_size and previous_tier == "full" and CONTINUATION_RE.match(text):
+            return "full", "follow-up"
+        if response_style in self.routes["fast_styles"]:
+            return "fast", "concise-style"
+        if '?' not in text and len(text.split()) <= 4:
+            return "fast", "short"
+        return "full", "default"
+
+    def route(self, message: str, history_size: int = 0, response_style: Optional[str] = None,
+              previous_tier: Optional[str] = None) -> Dict[str, Any]:
+        """Pick a tier, stepping around one that is failing or slower than the full model"""
+        tier, reason = self.classify(message, history_size, response_style, previous_tier)
+        tiers = self.routes["tiers"]
+        if tier not in tiers:
+            tier, reason = "full", "unconfigured"
+        if tier != "full" and "full" in tiers:
+            chosen = self._observed(tiers[tier]["model"])
+            full = self._observed(tiers["full"]["model"])
+            degraded = None
+            if chosen and chosen["error_rate"] > self.routes["max_error_rate"]:
+                degraded = "failing"
+            elif chosen and full and chosen["latency"] > full["latency"]:
+                degraded = "slower"
+            if degraded:
+                with self._lock:
+                    self.skipped += 1
+                    probe = self.skipped % self.routes["probe_every"] == 0
+                if probe:
+                    reason = f"probe-{degraded}"
+                else:
+                    tier, reason = "full", f"{tier}-{degraded}"
+
+        with self._lock:
+            self.routed[tier] = self.routed.get(tier, 0) + 1
+        return dict(tiers[tier], tier=tier, reason=reason)
+
+    def _observed(self, model: str) -> Optional[Dict[str, float]]:
+        with self._lock:
+            stats = self._models.get(model)
+            return dict(stats) if stats and stats["requests"] >= 5 else None
+
+    def record(self, model: str, latency: float, ok: bool = True):
+        """Fold one completed request into the model's latency and error-rate EWMAs"""
+        with self._lock:
+            stats = self._models.get(model)
+            if stats is None:
+                self._models[model] = {"requests": 1, "latency": latency, "error_rate": 0.0 if ok else 1.0}
+                return
+            stats["requests"] += 1
+            stats["error_rate"] += self.alpha * ((0.0 if ok else 1.0) - stats["error_rate"])
+            if ok:
+                stats["latency"] += self.alpha * (latency - stats["latency"])
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get routing counts and per-model latency"""
+        with self._lock:
+            return {
+                'routed': dict(self.routed),
+                'skipped': self.skipped,
+                'models': {
+                    model: {
+                        'requests': int(stats["requests"]),
+                        'latency_ms': int(stats["latency"] * 1000),
+                        'error_rate': round(stats["error_rate"], 3)
+                    }
+                    for model, stats in self._models.items()
+                }
+            }
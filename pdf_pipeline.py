@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PDF Pipeline for ATLAS AI Telegram Bots
+Renders markdown-ish AI output as many small, escaped reportlab flowables
+"""
+
+import io
+import os
+import re
+from typing import Iterator, List, Optional
+from doc_templates import pdf_bullet_style, pdf_styles
+
+# Longer input is cut off with a note, which bounds build time and memory
+MAX_PDF_CHARS = int(os.getenv('PDF_MAX_CHARS', 500_000))
+PARAGRAPH_MAX_LINES = 20    # soft-wrapped lines joined into one Paragraph before starting another
+PARAGRAPH_MAX_CHARS = 3000  # reportlab splits a Paragraph across pages in quadratic time, so keep each one small
+CODE_CHUNK_LINES = 40       # code blocks are split so no single flowable gets huge
+CODE_MAX_LINE_CHARS = 80    # Courier 8.5pt in the indented code style fits about this many per line
+
+HEADING_RE = re.compile(r'^(#{1,6})\s+(.*)$')
+BULLET_RE = re.compile(r'^(\s*)([-*+•])\s+(.*)$')
+NUMBERED_RE = re.compile(r'^(\s*)(\d+)[.)]\s+(.*)$')
+BOLD_RE = re.compile(r'\*\*(.+?)\*\*|(?<![\w.])__(?!\s)(.+?)(?<!\s)__(?![\w(])')  # not obj.__init__()
+ITALIC_RE = re.compile(r'(?<![\w*])\*(?!\s)(.+?)(?<!\s)\*(?![\w*])')
+CODE_RE = re.compile(r'`([^`]+)`')
+
+def escape(text: str) -> str:
+    """Escape reportlab paragraph markup in raw model output"""
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+def _emphasis(text: str) -> str:
+    """Bold, then italic separately inside and outside each bold span, so tags always nest"""
+    parts = []
+    last = 0
+    for match in BOLD_RE.finditer(text):
+        parts.append(_italic(text[last:match.start()]))
+        parts.append(f'<b>{_italic(match.group(1) or match.group(2))}</b>')
+        last = match.end()
+    parts.append(_italic(text[last:]))
+    return ''.join(parts)
+
+def _italic(text: str) -> str:
+    return ITALIC_RE.sub(lambda m: f'<i>{m.group(1)}</i>', escape(text))
+
+def inline_markup(text: str) -> str:
+    """Escape a line, then map `code`, **bold** and *italic* to paragraph tags (code spans stay literal)"""
+    parts = []
+    last = 0
+    for match in CODE_RE.finditer(text):
+        parts.append(_emphasis(text[last:match.start()]))
+        parts.append(f'<font face="Courier">{escape(match.group(1))}</font>')
+        last = match.end()
+    parts.append(_emphasis(text[last:]))
+    return ''.join(parts)
+
+def split_text(text: str, limit: int = PARAGRAPH_MAX_CHARS) -> List[str]:
+    """Cut text into pieces of at most `limit` characters, breaking on whitespace where possible"""
+    pieces = []
+    while len(text) > limit:
+        cut = text.rfind(' ', limit // 2, limit + 1)
+        if cut == -1:
+            cut = limit
+        pieces.append(text[:cut].rstrip())
+        text = text[cut:].lstrip()
+    pieces.append(text)
+    return pieces
+
+def code_flowables(code: List[str], style) -> Iterator:
+    """Preformatted chunks of a code block, hard-wrapping lines too wide for the page"""
+    from reportlab.platypus import Preformatted
+
+    for start in range(0, len(code), CODE_CHUNK_LINES):
+        yield Preformatted('\n'.join(code[start:start + CODE_CHUNK_LINES]), style,
+                           maxLineLength=CODE_MAX_LINE_CHARS, newLineChars='')
+
+def safe_paragraph(markup: str, plain: str, style, **kwargs):
+    """Paragraph from markup, or from the escaped plain text if reportlab rejects the markup"""
+    from reportlab.platypus import Paragraph
+
+    try:
+        return Paragraph(markup, style, **kwargs)
+    except ValueError as e:
+        print(f"⚠️ PDF markup fallback: {e}")
+        return Paragraph(escape(plain).replace('\n', '<br/>'), style, **kwargs)
+
+def markdown_flowables(content: str) -> Iterator:
+    """Yield one small flowable per heading, list item, paragraph or code chunk"""
+    styles = pdf_styles()
+    paragraph: List[str] = []
+    paragraph_chars = 0
+    code: Optional[List[str]] = None
+
+    def flush_paragraph():
+        nonlocal paragraph_chars
+        if paragraph:
+            yield safe_paragraph('<br/>'.join(inline_markup(text) for text in paragraph),
+                                 '\n'.join(paragraph), styles['body'])
+            paragraph.clear()
+            paragraph_chars = 0
+
+    for line in content.splitlines():
+        if line.strip().startswith('```'):
+            yield from flush_paragraph()
+            if code is None:
+                code = []
+            else:
+                yield from code_flowables(code, styles['code'])
+                code = None
+            continue
+        if code is not None:
+            code.append(line.expandtabs(4))
+            continue
+
+        stripped = line.strip()
+        heading = HEADING_RE.match(stripped)
+        bullet = BULLET_RE.match(line) or NUMBERED_RE.match(line)
+        if not stripped:
+            yield from flush_paragraph()
+        elif heading:
+            yield from flush_paragraph()
+            level = min(len(heading.group(1)), 3)
+            for piece in split_text(heading.group(2)):
+                yield safe_paragraph(inline_markup(piece), piece, styles[f'h{level}'])
+        elif bullet:
+            yield from flush_paragraph()
+            marker = '•' if not bullet.group(2).isdigit() else f'{bullet.group(2)}.'
+            indent = len(bullet.group(1).expandtabs(4)) // 2 * 12
+            style = styles['bullet']
+            if indent:
+                style = pdf_bullet_style(indent)
+            for piece in split_text(bullet.group(3)):
+                yield safe_paragraph(inline_markup(piece), piece, style, bulletText=marker)
+                marker = None  # Continuation pieces of a long item carry no bullet
+        else:
+            for piece in split_text(stripped):
+                if paragraph and paragraph_chars + len(piece) > PARAGRAPH_MAX_CHARS:
+                    yield from flush_paragraph()
+                paragraph.append(piece)
+                paragraph_chars += len(piece)
+                if len(paragraph) >= PARAGRAPH_MAX_LINES:
+                    yield from flush_paragraph()
+
+    yield from flush_paragraph()
+    if code:
+        # Unterminated fence: still render what we have
+        yield from code_flowables(code, styles['code'])
+
+def render_pdf(title: str, content: str, subtitle: Optional[str] = None) -> bytes:
+    """Render title, optional subtitle line and markdown content to PDF bytes"""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
+
+    styles = pdf_styles()
+    if len(content) > MAX_PDF_CHARS:
+        content = content[:MAX_PDF_CHARS] + f"\n\n*[Truncated after {MAX_PDF_CHARS:,} characters]*"
+
+    story = [Paragraph(escape(title), styles['title']), Spacer(1, 12)]
+    if subtitle:
+        story.append(Paragraph(escape(subtitle), styles['meta']))
+        story.append(Spacer(1, 12))
+    story.extend(markdown_flowables(content))
+
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter, title=title)
+    doc.build(story)
+    return buffer.getvalue()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Response Cache for ATLAS AI Telegram Bot
+Exact-match cache of Groq replies for stateless prompts, with TTL and LRU bounds
+"""
+
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+_SPACE_RE = re.compile(r'\s+')
+# Answers that depend on the time of day; cached context only carries the date
+_CLOCK_RE = re.compile(r"\b(what time|time is it|current time|time now|right now|clock|o'?clock|hours? (ago|from now)|"
+                       r"minutes? (ago|from now)|timezone|time zone)\b", re.IGNORECASE)
+
+def normalize_prompt(text: str) -> str:
+    """Case-fold, collapse whitespace and drop trailing punctuation so trivial variants share an entry"""
+    return _SPACE_RE.sub(' ', text.casefold()).strip().rstrip('?!.… ')
+
+def needs_clock(text: str) -> bool:
+    """True for prompts whose answer depends on the current time, which must not be shared"""
+    return bool(_CLOCK_RE.search(text))
+
+class ResponseCache:
+    """LRU + TTL map of (normalized prompt, model, context fingerprint) -> reply"""
+
+    def __init__(self, max_entries: int = 2000, ttl: float = 3600):
+        self.max_entries = max(0, max_entries)
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    @staticmethod
+    def key(payload: Dict) -> str:
+        """Cache key for a chat completion payload; everything but the last user message is the context"""
+        *context, last = payload["messages"]
+        fingerprint = json.dumps(
+            [payload.get("model"), payload.get("temperature"), payload.get("max_tokens"), context],
+            sort_keys=True, ensure_ascii=False
+        )
+        digest = hashlib.sha256(fingerprint.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(normalize_prompt(last["content"]).encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached reply, or None on a miss or expired entry"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] > self.ttl:
+                del self._entries[key]
+                self.expired += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, reply: str):
+        """Store a successful reply"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), reply)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'expired': self.expired,
+                'evictions': self.evictions
+            }
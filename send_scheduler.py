@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Outbound Send Scheduler for ATLAS AI Telegram Bot
+Token buckets per chat and globally, with 429 retry_after handling
+"""
+
+import os
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, up to `capacity` banked"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def delay(self, now: float) -> float:
+        """Seconds until a token is available (0 if one is available now)"""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self):
+        """Consume one token (call after delay() returned 0)"""
+        self.tokens -= 1
+
+class OutboundScheduler:
+    """Send Telegram requests in per-chat FIFO order within global and per-chat rate limits"""
+
+    def __init__(self, global_rate: float = 30, per_chat_rate: float = 1, per_chat_burst: float = 3,
+                 workers: int = 8, max_retries: int = 3):
+        self.global_bucket = TokenBucket(global_rate, global_rate)
+        self.per_chat_rate = per_chat_rate
+        self.per_chat_burst = per_chat_burst
+        self.workers = max(1, workers)
+        self.max_retries = max_retries
+        self._queues: Dict[Hashable, deque] = {}
+        self._buckets: Dict[Hashable, TokenBucket] = {}
+        self._heap = []  # (eligible_at, seq, chat_id) for chats with work and no send in progress
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._threads = []
+        self.sent = 0
+        self.rate_limited = 0
+        self.failed = 0
+
+    def start(self):
+        """Start sender threads"""
+        with self._cond:
+            if self._threads:
+                return
+            for index in range(self.workers):
+                thread = threading.Thread(target=self._worker, name=f"atlas-sender-{index}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, chat_id: Hashable, send: Callable[[], Any]) -> Future:
+        """Queue a send; `send` performs the request and returns the requests.Response"""
+        future = Future()
+        with self._cond:
+            if not self._threads:
+                self.start()
+            queue = self._queues.get(chat_id)
+            if queue is None:
+                queue = self._queues[chat_id] = deque()
+                self._schedule(chat_id, time.monotonic())
+            queue.append((send, future, 0))
+            self._cond.notify()
+        return future
+
+    def _schedule(self, chat_id: Hashable, eligible_at: float):
+        heapq.heappush(self._heap, (eligible_at, next(self._seq), chat_id))
+
+    def _next_job(self):
+        """Block until some chat may send within the rate limits, then claim its next job"""
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+
+                eligible_at, _, chat_id = self._heap[0]
+                if eligible_at > now:
+                    self._cond.wait(eligible_at - now)
+                    continue
+                heapq.heappop(self._heap)
+
+                bucket = self._buckets.get(chat_id)
+                if bucket is None:
+                    bucket = self._buckets[chat_id] = TokenBucket(self.per_chat_rate, self.per_chat_burst)
+                wait = max(bucket.delay(now), self.global_bucket.delay(now))
+                if wait > 0:
+                    self._schedule(chat_id, now + wait)
+                    continue
+
+                bucket.take()
+                self.global_bucket.take()
+                send, future, attempts = self._queues[chat_id].popleft()
+                return chat_id, send, future, attempts
+
+    def _finish(self, chat_id: Hashable, outcome: str, retry=None, retry_after: float = 0):
+        """Put a retried job back at the front, then reschedule or retire the chat"""
+        with self._cond:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+            queue = self._queues[chat_id]
+            if retry is not None:
+                queue.appendleft(retry)
+            if queue:
+                self._schedule(chat_id, time.monotonic() + retry_after)
+            else:
+                del self._queues[chat_id]
+                bucket = self._buckets.get(chat_id)
+                # Full buckets carry no state worth keeping
+                if bucket is not None and bucket.delay(time.monotonic()) == 0 and bucket.tokens >= bucket.capacity:
+                    del self._buckets[chat_id]
+            self._cond.notify()
+
+    def _worker(self):
+        while True:
+            chat_id, send, future, attempts = self._next_job()
+            try:
+                response = send()
+            except Exception as e:
+                future.set_exception(e)
+                self._finish(chat_id, 'failed')
+                continue
+
+            if getattr(response, 'status_code', None) == 429 and attempts < self.max_retries:
+                retry_after = _retry_after(response)
+                print(f"⏳ Telegram rate limit for {chat_id}, retrying in {retry_after}s")
+                self._finish(chat_id, 'rate_limited', retry=(send, future, attempts + 1), retry_after=retry_after)
+                continue
+
+            future.set_result(response)
+            self._finish(chat_id, 'sent')
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get scheduler statistics"""
+        with self._cond:
+            queued = sum(len(queue) for queue in self._queues.values())
+            chats = len(self._queues)
+        return {
+            'queued': queued,
+            'chats': chats,
+            'sent': self.sent,
+            'rate_limited': self.rate_limited,
+            'failed': self.failed
+        }
+
+class AsyncOutboundScheduler:
+    """asyncio twin of OutboundScheduler for the async runtime: same buckets, limits and 429 handling"""
+
+    def __init__(self, global_rate: float = 30, per_chat_rate: float = 1, per_chat_burst: float = 3,
+                 max_retries: int = 3):
+        self.global_bucket = TokenBucket(global_rate, global_rate)
+        self.per_chat_rate = per_chat_rate
+        self.per_chat_burst = per_chat_burst
+        self.max_retries = max_retries
+        self._buckets: Dict[Hashable, TokenBucket] = {}
+        self._chat_locks: Dict[Hashable, asyncio.Lock] = {}  # asyncio locks are FIFO: per-chat send order
+        self._waiting: Dict[Hashable, int] = {}
+        self.sent = 0
+        self.rate_limited = 0
+        self.failed = 0
+
+    @classmethod
+    def like(cls, scheduler: OutboundScheduler) -> "AsyncOutboundScheduler":
+        """Copy the limits configured on the thread scheduler"""
+        return cls(scheduler.global_bucket.rate, scheduler.per_chat_rate, scheduler.per_chat_burst,
+                   scheduler.max_retries)
+
+    async def _acquire(self, chat_id: Hashable):
+        """Sleep until both the chat's bucket and the global bucket have a token, then take them"""
+        bucket = self._buckets.get(chat_id)
+        if bucket is None:
+            bucket = self._buckets[chat_id] = TokenBucket(self.per_chat_rate, self.per_chat_burst)
+        while True:
+            now = time.monotonic()
+            wait = max(bucket.delay(now), self.global_bucket.delay(now))
+            if wait <= 0:
+                bucket.take()
+                self.global_bucket.take()
+                return
+            await asyncio.sleep(wait)
+
+    async def submit(self, chat_id: Hashable, send: Callable[[], Awaitable[Tuple[int, Any]]]) -> Tuple[int, Any]:
+        """Run `send` (returns (status, body); called again on retry) within the limits, in per-chat order"""
+        lock = self._chat_locks.get(chat_id)
+        if lock is None:
+            lock = self._chat_locks[chat_id] = asyncio.Lock()
+        self._waiting[chat_id] = self._waiting.get(chat_id, 0) + 1
+        try:
+            async with lock:
+                for attempt in range(self.max_retries + 1):
+                    await self._acquire(chat_id)
+                    try:
+                        status, body = await send()
+                    except Exception:
+                        self.failed += 1
+                        raise
+                    if status != 429 or attempt == self.max_retries:
+                        self.sent += 1
+                        return status, body
+                    self.rate_limited += 1
+                    retry_after = _body_retry_after(body)
+                    print(f"⏳ Telegram rate limit for {chat_id}, retrying in {retry_after}s")
+                    await asyncio.sleep(retry_after)
+        finally:
+            self._waiting[chat_id] -= 1
+            if not self._waiting[chat_id]:
+                del self._waiting[chat_id]
+                del self._chat_locks[chat_id]
+                bucket = self._buckets.get(chat_id)
+                if bucket is not None and bucket.delay(time.monotonic()) == 0 and bucket.tokens >= bucket.capacity:
+                    del self._buckets[chat_id]
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get scheduler statistics (same keys as OutboundScheduler)"""
+        return {
+            'queued': sum(self._waiting.values()),
+            'chats': len(self._waiting),
+            'sent': self.sent,
+            'rate_limited': self.rate_limited,
+            'failed': self.failed
+        }
+
+def create_outbound_scheduler() -> OutboundScheduler:
+    """Build the send scheduler from environment settings"""
+    return OutboundScheduler(
+        global_rate=float(os.getenv('TELEGRAM_GLOBAL_RATE', 30)),
+        per_chat_rate=float(os.getenv('TELEGRAM_CHAT_RATE', 1)),
+        per_chat_burst=float(os.getenv('TELEGRAM_CHAT_BURST', 3)),
+        workers=int(os.getenv('OUTBOUND_WORKERS', 8))
+    )
+
+def _body_retry_after(body) -> float:
+    """Telegram's retry_after from a decoded error body"""
+    try:
+        return float(body['parameters']['retry_after'])
+    except Exception:
+        return 1.0
+
+def _retry_after(response) -> float:
+    """Read Telegram's retry_after (body parameters or Retry-After header)"""
+    try:
+        return float(response.json()['parameters']['retry_after'])
+    except Exception:
+        pass
+    try:
+        return float(response.headers.get('Retry-After', 1))
+    except (TypeError, ValueError):
+        return 1.0
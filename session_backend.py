@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Session Backends for ATLAS AI Telegram Bot
+Durable session storage with batched write-behind flushing
+"""
+
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+def _encode(value):
+    """JSON hook for datetimes in sessions"""
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+def _decode(obj: Dict):
+    """JSON hook restoring datetimes"""
+    if "__datetime__" in obj and len(obj) == 1:
+        return datetime.fromisoformat(obj["__datetime__"])
+    return obj
+
+def serialize_session(session: Dict) -> str:
+    """Serialize a snapshot of a live session"""
+    snapshot = dict(session)
+    snapshot["messages"] = list(session.get("messages", []))  # copy: workers may append meanwhile
+    return json.dumps(snapshot, default=_encode, ensure_ascii=False)
+
+def deserialize_session(data: str) -> Dict:
+    """Restore a session from its serialized form"""
+    return json.loads(data, object_hook=_decode)
+
+class SessionBackend:
+    """Durable session storage interface (the default keeps nothing)"""
+
+    def load(self, user_id: Hashable) -> Optional[Dict]:
+        """Load one session, or None if it was never stored"""
+        return None
+
+    def save_many(self, sessions: Iterable[Tuple[Hashable, str]]):
+        """Store serialized sessions in one batch"""
+
+    def delete_many(self, user_ids: Iterable[Hashable]):
+        """Remove sessions (and their turn logs) in one batch"""
+
+    def purge_turns(self, user_ids: Iterable[Hashable]):
+        """Remove users' turn logs in one batch, keeping their sessions"""
+
+    def append_turns(self, turns: Iterable[Tuple[Hashable, Dict]]):
+        """Append (user_id, message) rows to the full conversation log"""
+
+    def iter_turns(self, user_id: Hashable) -> Iterator[Dict]:
+        """Yield a user's logged messages oldest first"""
+        return iter(())
+
+    def close(self):
+        """Release backend resources"""
+
+class SQLiteSessionBackend(SessionBackend):
+    """SQLite session storage in WAL mode"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "user_id TEXT PRIMARY KEY, data TEXT NOT NULL, updated_at TEXT NOT NULL)"
+            )
+            # Every turn ever exchanged; sessions only keep the recent window
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS turns ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, user_id TEXT NOT NULL, ts TEXT, "
+                "role TEXT NOT NULL, content TEXT NOT NULL, tokens INTEGER)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS turns_user ON turns (user_id, id)")
+
+    def load(self, user_id: Hashable) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM sessions WHERE user_id = ?", (str(user_id),)).fetchone()
+        return deserialize_session(row[0]) if row else None
+
+    def save_many(self, sessions: Iterable[Tuple[Hashable, str]]):
+        now = datetime.now().isoformat()
+        rows = [(str(user_id), data, now) for user_id, data in sessions]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO sessions (user_id, data, updated_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT(user_id) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at",
+                    rows
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def delete_many(self, user_ids: Iterable[Hashable]):
+        rows = [(str(user_id),) for user_id in user_ids]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany("DELETE FROM sessions WHERE user_id = ?", rows)
+                self._conn.executemany("DELETE FROM turns WHERE user_id = ?", rows)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def purge_turns(self, user_ids: Iterable[Hashable]):
+        rows = [(str(user_id),) for user_id in user_ids]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany("DELETE FROM turns WHERE user_id = ?", rows)
+
+    def append_turns(self, turns: Iterable[Tuple[Hashable, Dict]]):
+        rows = [(str(user_id), message.get("ts"), message["role"], message["content"], message.get("tokens"))
+                for user_id, message in turns]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO turns (user_id, ts, role, content, tokens) VALUES (?, ?, ?, ?, ?)", rows
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def iter_turns(self, user_id: Hashable, page_size: int = 500) -> Iterator[Dict]:
+        # Keyset pages keep memory flat and only hold the lock for one page at a time
+        last_id = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT id, ts, role, content, tokens FROM turns WHERE user_id = ? AND id > ? ORDER BY id LIMIT ?",
+                    (str(user_id), last_id, page_size)
+                ).fetchall()
+            for row_id, ts, role, content, tokens in rows:
+                yield {"ts": ts, "role": role, "content": content, "tokens": tokens}
+            if len(rows) < page_size:
+                return
+            last_id = rows[-1][0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+class WriteBehindFlusher:
+    """Collect dirty sessions and flush them to the backend in background batches"""
+
+    def __init__(self, backend: SessionBackend, interval: float = 2.0, batch_size: int = 200):
+        self.backend = backend
+        self.interval = interval
+        self.batch_size = max(1, batch_size)
+        self._dirty: Dict[Hashable, Dict] = {}
+        self._deleted = set()
+        self._purge = set()  # turn logs to erase; a new session after /clear must not cancel this
+        self._writing: Dict[Hashable, Optional[Dict]] = {}  # batch being written right now
+        self._turns: List[Tuple[Hashable, Dict]] = []
+        self._flush_lock = threading.Lock()  # the flush thread and on-demand flushes take turns
+        self._cond = threading.Condition()
+        self._thread = None
+        self._running = False
+        self.flushes = 0
+        self.rows_written = 0
+        self.errors = 0
+
+    def start(self):
+        """Start the background flush thread"""
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._loop, name="atlas-session-flush", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the thread after a final flush"""
+        with self._cond:
+            if not self._running:
+                return
+            self._running = False
+            self._cond.notify_all()
+        self._thread.join()
+        self.flush()
+
+    def mark_dirty(self, user_id: Hashable, session: Dict):
+        """Schedule a session for the next flush (never touches disk)"""
+        with self._cond:
+            self._deleted.discard(user_id)
+            self._dirty[user_id] = session
+            if len(self._dirty) >= self.batch_size:
+                self._cond.notify_all()
+
+    def mark_deleted(self, user_id: Hashable):
+        """Schedule a session for deletion"""
+        with self._cond:
+            self._dirty.pop(user_id, None)
+            self._deleted.add(user_id)
+            self._purge.add(user_id)
+            self._turns = [turn for turn in self._turns if turn[0] != user_id]
+
+    def append_turns(self, user_id: Hashable, messages: Iterable[Dict]):
+        """Queue messages for the conversation log"""
+        with self._cond:
+            self._turns.extend((user_id, message) for message in messages)
+
+    def pending(self, user_id: Hashable) -> Tuple[bool, Optional[Dict]]:
+        """(True, session or None if deleted) when a change is still unflushed"""
+        with self._cond:
+            if user_id in self._dirty:
+                return True, self._dirty[user_id]
+            if user_id in self._deleted:
+                return True, None
+            if user_id in self._writing:
+                return True, self._writing[user_id]
+        return False, None
+
+    def flush(self):
+        """Write all pending changes now"""
+        with self._flush_lock:
+            self._flush()
+
+    def _flush(self):
+        with self._cond:
+            dirty, self._dirty = self._dirty, {}
+            deleted, self._deleted = self._deleted, set()
+            purge, self._purge = self._purge, set()
+            turns, self._turns = self._turns, []
+            self._writing = dict(dirty)
+            self._writing.update((user_id, None) for user_id in deleted)
+        if not dirty and not deleted and not purge and not turns:
+            return
+
+        try:
+            items = list(dirty.items())
+            for start in range(0, len(items), self.batch_size):
+                batch = items[start:start + self.batch_size]
+                self.backend.save_many((user_id, serialize_session(session)) for user_id, session in batch)
+            self.backend.delete_many(deleted)
+            self.backend.purge_turns(purge - deleted)
+            # After deletes, so turns logged since a /clear survive it
+            self.backend.append_turns(turns)
+            self.flushes += 1
+            self.rows_written += len(dirty)
+        except Exception as e:
+            self.errors += 1
+            print(f"❌ Session flush error: {e}")
+            # Requeue unless a newer change arrived meanwhile
+            with self._cond:
+                for user_id, session in dirty.items():
+                    self._dirty.setdefault(user_id, session)
+                self._deleted |= deleted - set(self._dirty)
+                self._purge |= purge
+                self._turns[:0] = turns
+        finally:
+            with self._cond:
+                self._writing = {}
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: not self._running or len(self._dirty) >= self.batch_size, self.interval)
+                if not self._running:
+                    return
+            self.flush()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get flush statistics"""
+        with self._cond:
+            pending = len(self._dirty) + len(self._deleted | self._purge) + len(self._turns)
+        return {
+            'pending': pending,
+            'flushes': self.flushes,
+            'rows_written': self.rows_written,
+            'errors': self.errors
+        }
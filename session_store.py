@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Session Store for ATLAS AI Telegram Bot
+Bounded user sessions with LRU eviction, idle TTL and history caps
+"""
+
+import atexit
+import time
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Hashable, Iterator, Optional
+from session_backend import SessionBackend, WriteBehindFlusher
+
+class SessionStore:
+    """Dict-like session store that evicts idle and least recently used sessions"""
+
+    def __init__(self, max_sessions: int = 10000, idle_ttl: float = 86400, max_history: int = 50,
+                 on_evict: Optional[Callable[[Hashable], Any]] = None, sweep_interval: float = 60,
+                 backend: Optional[SessionBackend] = None, flush_interval: float = 2.0):
+        self.max_sessions = max(1, max_sessions)
+        self.idle_ttl = idle_ttl
+        self.max_history = max(2, max_history)
+        self.on_evict = on_evict
+        self.sweep_interval = sweep_interval
+        self._sessions: "OrderedDict[Hashable, Dict]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._last_sweep = time.monotonic()
+        self.evicted_idle = 0
+        self.evicted_lru = 0
+        self.trimmed_messages = 0
+        self.loaded = 0
+        self.backend = backend
+        self.flusher = None
+        if backend is not None:
+            # Hot sessions stay in memory; changes reach disk in background batches
+            self.flusher = WriteBehindFlusher(backend, interval=flush_interval)
+            self.flusher.start()
+            atexit.register(self.close)
+
+    def get_or_create(self, user_id: Hashable, factory: Callable[[], Dict]) -> Dict:
+        """Get a session (marking it recently used) or create it with factory()"""
+        with self._lock:
+            self._maybe_sweep()
+            session = self._sessions.get(user_id)
+            if session is not None:
+                self._sessions.move_to_end(user_id)
+                return session
+
+            # Stored sessions load lazily on first access instead of at boot
+            session = self._load(user_id)
+            if session is None:
+                session = factory()
+                self.mark_dirty(user_id, session)
+            self._sessions[user_id] = session
+            while len(self._sessions) > self.max_sessions:
+                oldest, _ = self._sessions.popitem(last=False)
+                self.evicted_lru += 1
+                self._evicted(oldest)
+            return session
+
+    def _load(self, user_id: Hashable) -> Optional[Dict]:
+        """Load a session from the backend, if any"""
+        if self.backend is None:
+            return None
+        # An unflushed change is newer than what is on disk
+        pending, session = self.flusher.pending(user_id)
+        if pending:
+            return session
+        try:
+            session = self.backend.load(user_id)
+        except Exception as e:
+            print(f"❌ Session load error: {e}")
+            return None
+        if session is not None:
+            self.loaded += 1
+        return session
+
+    def mark_dirty(self, user_id: Hashable, session: Optional[Dict] = None):
+        """Queue a changed session for the write-behind flush"""
+        if self.flusher is None:
+            return
+        if session is None:
+            session = self.get(user_id)
+        if session is not None:
+            self.flusher.mark_dirty(user_id, session)
+
+    def append_turns(self, user_id: Hashable, messages):
+        """Log messages to the full conversation history (kept only with a backend)"""
+        if self.flusher is not None:
+            self.flusher.append_turns(user_id, messages)
+
+    @property
+    def keeps_turn_log(self) -> bool:
+        """True if every message is logged; without a backend only the recent window survives"""
+        return self.flusher is not None
+
+    def iter_turns(self, user_id: Hashable) -> Iterator[Dict]:
+        """Every logged message for a user, oldest first; the summary plus in-memory window without a backend"""
+        if self.flusher is None:
+            session = self.get(user_id)
+            if not session:
+                return iter([])
+            turns = list(session["messages"])
+            if session.get("summary"):
+                turns.insert(0, {"role": "summary", "content": session["summary"]})
+            return iter(turns)
+        self.flusher.flush()  # include turns still waiting for the write-behind flush
+        return self.backend.iter_turns(user_id)
+
+    def close(self):
+        """Flush pending changes and close the backend"""
+        if self.flusher is not None:
+            self.flusher.stop()
+            self.backend.close()
+            self.flusher = None
+
+    def trim_history(self, session: Dict):
+        """Drop the oldest messages beyond the per-session history cap"""
+        messages = session["messages"]
+        excess = len(messages) - self.max_history
+        if excess > 0:
+            del messages[:excess]
+            with self._lock:
+                self.trimmed_messages += excess
+
+    def sweep(self) -> int:
+        """Evict sessions idle for longer than the TTL"""
+        with self._lock:
+            self._last_sweep = time.monotonic()
+            if not self.idle_ttl or self.idle_ttl <= 0:
+                return 0
+
+            cutoff = datetime.now() - timedelta(seconds=self.idle_ttl)
+            idle = [user_id for user_id, session in self._sessions.items()
+                    if session.get("last_activity", cutoff) < cutoff]
+            for user_id in idle:
+                del self._sessions[user_id]
+                self._evicted(user_id)
+            self.evicted_idle += len(idle)
+            return len(idle)
+
+    def _maybe_sweep(self):
+        """Sweep at most once per sweep_interval, piggybacking on lookups"""
+        if time.monotonic() - self._last_sweep >= self.sweep_interval:
+            self.sweep()
+
+    def _evicted(self, user_id: Hashable):
+        """Notify the owner that a session is gone"""
+        if self.on_evict:
+            try:
+                self.on_evict(user_id)
+            except Exception as e:
+                print(f"❌ Session eviction callback error: {e}")
+
+    def __contains__(self, user_id: Hashable) -> bool:
+        with self._lock:
+            return user_id in self._sessions
+
+    def __getitem__(self, user_id: Hashable) -> Dict:
+        with self._lock:
+            return self._sessions[user_id]
+
+    def __delitem__(self, user_id: Hashable):
+        with self._lock:
+            del self._sessions[user_id]
+        if self.flusher is not None:
+            self.flusher.mark_deleted(user_id)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    def get(self, user_id: Hashable, default: Optional[Dict] = None) -> Optional[Dict]:
+        with self._lock:
+            return self._sessions.get(user_id, default)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get session store statistics"""
+        with self._lock:
+            stats = {
+                'sessions': len(self._sessions),
+                'max_sessions': self.max_sessions,
+                'evicted_idle': self.evicted_idle,
+                'evicted_lru': self.evicted_lru,
+                'trimmed_messages': self.trimmed_messages,
+                'loaded': self.loaded
+            }
+        if self.flusher is not None:
+            stats['persistence'] = self.flusher.get_stats()
+        return stats
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Single-Flight Coalescing for ATLAS AI Telegram Bot
+Concurrent identical requests share one upstream call and fan the result out
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+class _Call:
+    """One in-flight upstream call and the outcome its followers wait for"""
+
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """Run func once per key at a time; callers arriving meanwhile get the same result or exception"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._async_calls: Dict[Hashable, asyncio.Future] = {}  # touched only from the event loop
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        """Call func(), or wait for the identical call already in flight"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def do_async(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Await func(), or the identical coroutine already in flight on this loop"""
+        future = self._async_calls.get(key)
+        if future is not None:
+            with self._lock:
+                self.coalesced += 1
+            # Shielded so one follower giving up does not cancel everyone else's result
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())  # nobody may be waiting
+        self._async_calls[key] = future
+        with self._lock:
+            self.leaders += 1
+        try:
+            result = await func()
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            del self._async_calls[key]
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get coalescing statistics"""
+        with self._lock:
+            return {
+                'upstream_calls': self.leaders,
+                'coalesced': self.coalesced,
+                'in_flight': len(self._calls) + len(self._async_calls)
+            }
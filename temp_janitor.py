@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Temp File Janitor for ATLAS AI Telegram Bot
+Deletes uploaded files and keeps the media temp directory under a disk quota
+"""
+
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+class TempJanitor:
+    """Background cleaner for a temp directory: delete-after-upload, max age, oldest-first quota eviction"""
+
+    def __init__(self, directory: str, quota_bytes: int = 200 * 1024 * 1024, max_age: float = 3600,
+                 interval: float = 60, grace: float = 30):
+        self.directory = directory
+        self.quota_bytes = quota_bytes
+        self.max_age = max_age
+        self.interval = interval
+        self.grace = grace  # quota eviction leaves files this young alone; they may still be uploading
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.released = 0
+        self.expired = 0
+        self.evicted = 0
+        self.bytes_reclaimed = 0
+        self.usage_bytes = 0
+
+    def start(self):
+        """Start the background sweep thread"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._loop, name="atlas-temp-janitor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the sweep thread"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _owns(self, path: str) -> bool:
+        """Only files inside our directory are ever deleted"""
+        directory = os.path.abspath(self.directory)
+        return os.path.commonpath([directory, os.path.abspath(path)]) == directory
+
+    def _remove(self, path: str, counter: str) -> int:
+        """Delete one file and account for it; returns bytes reclaimed"""
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except FileNotFoundError:
+            return 0
+        except Exception as e:
+            print(f"❌ Temp cleanup error for {path}: {e}")
+            return 0
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+            self.bytes_reclaimed += size
+        return size
+
+    def release(self, file) -> int:
+        """Delete a file (path or spilled GeneratedFile) now that it has been uploaded"""
+        path: Optional[str] = getattr(file, 'path', file)
+        if not path or not isinstance(path, str) or not self._owns(path):
+            return 0
+        return self._remove(path, 'released')
+
+    def sweep(self) -> int:
+        """Expire old files, then evict oldest-first until under quota; returns bytes reclaimed"""
+        now = time.time()
+        files = []
+        try:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if entry.is_file(follow_symlinks=False):
+                        info = entry.stat(follow_symlinks=False)
+                        files.append((info.st_mtime, info.st_size, entry.path))
+        except FileNotFoundError:
+            return 0
+        except Exception as e:
+            print(f"❌ Temp sweep error: {e}")
+            return 0
+
+        reclaimed = 0
+        usage = 0
+        kept = []
+        for mtime, size, path in sorted(files):
+            if now - mtime > self.max_age:
+                reclaimed += self._remove(path, 'expired')
+            else:
+                kept.append((mtime, size, path))
+                usage += size
+
+        for mtime, size, path in kept:
+            if usage <= self.quota_bytes or now - mtime < self.grace:
+                break
+            freed = self._remove(path, 'evicted')
+            reclaimed += freed
+            usage -= size
+
+        with self._lock:
+            self.usage_bytes = usage
+        if reclaimed:
+            print(f"🧹 Temp janitor reclaimed {reclaimed // 1024} KB ({usage // 1024} KB in use)")
+        return reclaimed
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self.sweep()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get cleanup statistics"""
+        with self._lock:
+            return {
+                'released': self.released,
+                'expired': self.expired,
+                'evicted': self.evicted,
+                'bytes_reclaimed': self.bytes_reclaimed,
+                'usage_bytes': self.usage_bytes,
+                'quota_bytes': self.quota_bytes
+            }
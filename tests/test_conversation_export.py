@@ -0,0 +1,17 @@
+import pytest
+
+from conversation_export import export_xlsx
+
+def test_export_xlsx_drops_illegal_characters(tmp_path):
+    openpyxl = pytest.importorskip('openpyxl')
+    path = str(tmp_path / 'conversation.xlsx')
+    messages = [
+        {"role": "user", "content": "colour me \x1b[31mred\x1b[0m", "ts": "2026-10-18T10:00:00"},
+        {"role": "assistant\x07", "content": "=SUM(A1)\x00 done", "ts": "2026-10-18T10:00:01"}
+    ]
+
+    assert export_xlsx(messages, path) == 2
+
+    rows = list(openpyxl.load_workbook(path).active.iter_rows(min_row=2, values_only=True))
+    assert rows[0][1:3] == ("user", "colour me [31mred[0m")
+    assert rows[1][1:3] == ("assistant", "=SUM(A1) done")
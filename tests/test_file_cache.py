@@ -0,0 +1,29 @@
+import pytest
+
+from file_cache import FileIdCache, sent_file_id
+
+def test_key_is_per_user():
+    assert FileIdCache.key(1, 'pdf', 'Business Plan', 'text') != FileIdCache.key(2, 'pdf', 'Business Plan', 'text')
+    assert FileIdCache.key(1, 'pdf', 'Business Plan', 'text') == FileIdCache.key(1, 'pdf', 'Business Plan', 'text')
+
+def test_fake_telegram_upload_then_cached_resend():
+    pytest.importorskip('flask')
+    from fake_telegram import create_fake_api
+
+    client = create_fake_api().test_client()
+    cache = FileIdCache()
+    key = cache.key(42, 'pdf', 'Business Plan', 'content')
+    assert cache.get(key) is None
+
+    upload = client.post('/botTOKEN/sendDocument', data={'chat_id': '42', 'caption': 'x'}).get_json()['result']
+    file_id = sent_file_id(upload)
+    assert file_id
+    cache.put(key, file_id)
+
+    cached = cache.get(key)
+    resend = client.post('/botTOKEN/sendDocument', json={'chat_id': 42, 'document': cached}).get_json()['result']
+    assert sent_file_id(resend) == file_id
+    assert cache.get_stats()['hits'] == 1
+
+    voice = client.post('/botTOKEN/sendVoice', data={'chat_id': '42'}).get_json()['result']
+    assert sent_file_id(voice)
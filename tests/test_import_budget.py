@@ -0,0 +1,16 @@
+import os
+
+import pytest
+
+from import_budget import heavy_modules, median_import
+
+BUDGET_MS = float(os.getenv('IMPORT_BUDGET_MS', 250))
+
+@pytest.mark.parametrize('module', ['atlas_ai_telegram_bot', 'media_bot'])
+def test_cold_import_within_budget(module):
+    pytest.importorskip('requests')
+    median, totals, packages, loaded = median_import(module, runs=3)
+
+    assert not heavy_modules(loaded), f"heavy media libraries loaded by import {module}"
+    slowest = sorted(packages.items(), key=lambda item: -item[1])[:5]
+    assert median <= BUDGET_MS, f"import {module}: {median:.1f} ms over {BUDGET_MS:.0f} ms; slowest {slowest}"
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Text-to-Speech Pool for ATLAS AI Telegram Bot
+Long-lived pyttsx3 worker processes, OGG/Opus output and a cache of synthesized audio
+"""
+
+import io
+import os
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from document_jobs import DocumentJobPool
+from media_handler import GeneratedFile
+
+_engine = None  # one pyttsx3 engine per process, initialised on first use
+
+def _get_engine(rate: int, volume: float):
+    """Reuse this process's speech engine instead of calling pyttsx3.init() per request"""
+    global _engine
+    if _engine is None:
+        import pyttsx3
+        _engine = pyttsx3.init()
+    _engine.setProperty('rate', rate)
+    _engine.setProperty('volume', volume)
+    return _engine
+
+def _to_opus(wav_path: str, bitrate: str) -> Tuple[bytes, str]:
+    """Transcode to OGG/Opus for sendVoice; falls back to the raw WAV if ffmpeg is missing"""
+    try:
+        from pydub import AudioSegment
+        buffer = io.BytesIO()
+        AudioSegment.from_file(wav_path).export(buffer, format='ogg', codec='libopus', bitrate=bitrate,
+                                                parameters=['-application', 'voip'])
+        return buffer.getvalue(), 'ogg'
+    except Exception as e:
+        print(f"⚠️ Opus transcode failed, sending WAV: {e}")
+        with open(wav_path, 'rb') as f:
+            return f.read(), 'wav'
+
+def synthesize_speech(text: str, rate: int = 150, volume: float = 0.9, bitrate: str = '32k') -> Tuple[bytes, str]:
+    """Synthesize text in this process; returns (audio bytes, file extension)"""
+    fd, wav_path = tempfile.mkstemp(suffix='.wav')
+    os.close(fd)
+    try:
+        engine = _get_engine(rate, volume)
+        engine.save_to_file(text, wav_path)
+        engine.runAndWait()
+        return _to_opus(wav_path, bitrate)
+    finally:
+        try:
+            os.remove(wav_path)
+        except OSError:
+            pass
+
+class TTSPool:
+    """Voice synthesis on pooled worker processes with an LRU audio cache keyed by text hash"""
+
+    def __init__(self, workers: int = 1, max_pending: int = 8, timeout: float = 30,
+                 cache_bytes: int = 32 * 1024 * 1024, rate: int = 150, volume: float = 0.9, bitrate: str = '32k'):
+        self.jobs = DocumentJobPool(workers=workers, max_pending=max_pending, timeout=timeout, name='Voice')
+        self.cache_bytes = cache_bytes
+        self.rate = rate
+        self.volume = volume
+        self.bitrate = bitrate
+        self._cache: "OrderedDict[str, Tuple[bytes, str]]" = OrderedDict()
+        self._cached_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.rate}|{self.volume}|{self.bitrate}|{text}".encode('utf-8')).hexdigest()
+
+    def _get(self, key: str) -> Optional[Tuple[bytes, str]]:
+        with self._lock:
+            audio = self._cache.get(key)
+            if audio is None:
+                self.misses += 1
+                return None
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return audio
+
+    def _put(self, key: str, audio: Tuple[bytes, str]):
+        size = len(audio[0])
+        if size > self.cache_bytes:
+            return
+        with self._lock:
+            if key in self._cache:
+                return
+            self._cache[key] = audio
+            self._cached_bytes += size
+            while self._cached_bytes > self.cache_bytes:
+                _, (data, _) = self._cache.popitem(last=False)
+                self._cached_bytes -= len(data)
+
+    def synthesize(self, text: str, name: str = "voice") -> Tuple[Optional[GeneratedFile], Optional[str]]:
+        """Voice for text as an in-memory file; returns (file, user-facing error or None)"""
+        key = self._key(text)
+        audio = self._get(key)
+        if audio is None:
+            audio, error = self.jobs.run(synthesize_speech, text, self.rate, self.volume, self.bitrate)
+            if audio is None:
+                return None, error
+            self._put(key, audio)
+        data, extension = audio
+        return GeneratedFile(f"{name}.{extension}", data=data), None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get synthesis and cache statistics"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            stats = {
+                'cached': len(self._cache),
+                'cached_bytes': self._cached_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0
+            }
+        stats.update(self.jobs.get_stats())
+        return stats
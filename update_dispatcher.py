@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Update Dispatcher for ATLAS AI Telegram Bot
+Bounded worker pool that keeps each user's updates in order
+"""
+
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, Hashable, Optional
+
+class UpdateDispatcher:
+    """Run updates on a worker pool - in order per user, parallel across users"""
+
+    def __init__(self, workers: int = 8, queue_size: int = 256):
+        self.workers = max(1, workers)
+        self.queue_size = max(1, queue_size)
+        self._pending: Dict[Hashable, deque] = {}  # key -> jobs, present while queued or running
+        self._ready = deque()  # keys with work and no job currently running
+        self._queued = 0
+        self._cond = threading.Condition()
+        self._threads = []
+        self._running = False
+        self.processed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def start(self):
+        """Start worker threads"""
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"atlas-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, wait: bool = True):
+        """Stop workers once queued updates are drained"""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+
+        if wait:
+            for thread in self._threads:
+                thread.join()
+        self._threads = []
+
+    def submit(self, key: Hashable, func: Callable[..., Any], *args, timeout: Optional[float] = None) -> bool:
+        """Queue a job for key; blocks while the queue is full (backpressure on polling)"""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._queued < self.queue_size, timeout):
+                self.rejected += 1
+                return False
+
+            jobs = self._pending.get(key)
+            if jobs is None:
+                jobs = self._pending[key] = deque()
+                self._ready.append(key)
+            jobs.append((func, args))
+            self._queued += 1
+            self._cond.notify_all()
+        return True
+
+    def _worker(self):
+        """Take the next ready key, run one of its jobs, then requeue the key"""
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._ready or not self._running)
+                if not self._ready:
+                    return
+                key = self._ready.popleft()
+                func, args = self._pending[key].popleft()
+
+            try:
+                func(*args)
+                failed = False
+            except Exception as e:
+                print(f"❌ Worker error ({key}): {e}")
+                failed = True
+
+            with self._cond:
+                self._queued -= 1
+                if failed:
+                    self.failed += 1
+                else:
+                    self.processed += 1
+
+                # Re-append at the back so one busy user cannot starve others
+                if self._pending[key]:
+                    self._ready.append(key)
+                else:
+                    del self._pending[key]
+                self._cond.notify_all()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get dispatcher statistics"""
+        with self._cond:
+            return {
+                'workers': self.workers,
+                'queue_size': self.queue_size,
+                'queued': self._queued,
+                'busy_users': len(self._pending),
+                'processed': self.processed,
+                'failed': self.failed,
+                'rejected': self.rejected
+            }
+
+def poll_backoff(failures: int, cap: float = 60.0) -> float:
+    """Seconds to wait after `failures` consecutive failed getUpdates calls (1, 2, 4 ... up to cap)"""
+    return min(cap, 2.0 ** max(0, failures - 1))
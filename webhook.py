@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Webhook Ingress for ATLAS AI Telegram Bots
+Telegram POSTs updates to Flask; a bounded queue feeds the bot's dispatcher
+"""
+
+import os
+import hmac
+import queue
+from collections import OrderedDict
+from typing import Dict, Optional
+
+WEBHOOK_PATH = '/telegram/webhook'
+
+class WebhookIngress:
+    """Bounded update queue between the Flask webhook route and the bot"""
+
+    def __init__(self, queue_size: int = 1000, secret: Optional[str] = None, dedupe_size: int = 10000):
+        self.updates = queue.Queue(maxsize=max(1, queue_size))
+        self.secret = secret
+        # Recently seen update_ids; concurrent deliveries arrive out of order, so no high-water mark
+        self.seen: "OrderedDict[int, None]" = OrderedDict()
+        self.dedupe_size = max(1, dedupe_size)
+        self.received = 0
+        self.rejected = 0
+        self.duplicates = 0
+
+    def verify(self, token: Optional[str]) -> bool:
+        """Check Telegram's X-Telegram-Bot-Api-Secret-Token header"""
+        if not self.secret:
+            return True
+        return hmac.compare_digest(token or '', self.secret)
+
+    def push(self, update: Dict) -> bool:
+        """Queue an update without blocking the request thread"""
+        try:
+            self.updates.put_nowait(update)
+            self.received += 1
+            return True
+        except queue.Full:
+            # Telegram retries non-2xx deliveries, so a full queue is backpressure, not loss
+            self.rejected += 1
+            return False
+
+    def register(self, bot, public_url: str) -> bool:
+        """Point Telegram at this server's webhook route"""
+        if not public_url:
+            print("❌ WEBHOOK_URL is not set - Telegram cannot reach the webhook")
+            return False
+        try:
+            payload = {
+                'url': f"{public_url.rstrip('/')}{WEBHOOK_PATH}",
+                'allowed_updates': ['message'],
+                'max_connections': int(os.getenv('WEBHOOK_MAX_CONNECTIONS', 40))
+            }
+            if self.secret:
+                payload['secret_token'] = self.secret
+
+            response = bot.http.post(f"{bot.telegram_api}/setWebhook", json=payload, timeout=30)
+            if response.status_code == 200:
+                print(f"✅ Webhook registered: {payload['url']}")
+                return True
+            print(f"❌ Webhook registration failed: {response.status_code}")
+            return False
+        except Exception as e:
+            print(f"❌ Webhook registration error: {e}")
+            return False
+
+    def run(self, bot):
+        """Feed queued updates to the bot's worker pool forever"""
+        if bot.runtime_mode == 'async':
+            print("⚠️ BOT_RUNTIME=async is ignored in webhook mode; updates run on the thread pool")
+        bot.dispatcher.start()
+        print(f"🪝 Webhook mode active ({self.updates.maxsize} queued updates max)")
+
+        while True:
+            update = self.updates.get()
+            try:
+                # Telegram may redeliver after a slow ack; skip what we already took
+                update_id = update.get('update_id')
+                if update_id in self.seen:
+                    self.duplicates += 1
+                    continue
+                if update_id is not None:
+                    self.seen[update_id] = None
+                    if len(self.seen) > self.dedupe_size:
+                        self.seen.popitem(last=False)
+                    bot.last_update_id = max(bot.last_update_id, update_id)
+
+                parsed = bot.parse_update(update)
+                if parsed:
+                    key, args = parsed
+                    bot.dispatcher.submit(key, bot.process_message, *args)
+            except Exception as e:
+                print(f"❌ Webhook update error: {e}")
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get webhook statistics"""
+        return {
+            'received': self.received,
+            'rejected': self.rejected,
+            'duplicates': self.duplicates,
+            'queued': self.updates.qsize()
+        }
+
+def create_ingress() -> WebhookIngress:
+    """Build the ingress from environment settings"""
+    return WebhookIngress(
+        queue_size=int(os.getenv('WEBHOOK_QUEUE_SIZE', 1000)),
+        secret=os.getenv('WEBHOOK_SECRET'),
+        dedupe_size=int(os.getenv('WEBHOOK_DEDUPE_SIZE', 10000))
+    )
+
+def delete_webhook(bot) -> bool:
+    """Drop any webhook left by an earlier webhook-mode deploy; Telegram answers getUpdates with 409 while one is set"""
+    try:
+        response = bot.http.post(f"{bot.telegram_api}/deleteWebhook", json={}, timeout=30)
+        if response.status_code == 200:
+            return True
+        print(f"❌ Webhook removal failed: {response.status_code}")
+        return False
+    except Exception as e:
+        print(f"❌ Webhook removal error: {e}")
+        return False
+
+def webhook_enabled() -> bool:
+    """True when BOT_MODE selects webhook ingestion instead of polling"""
+    return os.getenv('BOT_MODE', 'polling').lower() == 'webhook'
+
+def webhook_public_url() -> Optional[str]:
+    """Public base URL Telegram should call (Render sets RENDER_EXTERNAL_URL)"""
+    return os.getenv('WEBHOOK_URL') or os.getenv('RENDER_EXTERNAL_URL')